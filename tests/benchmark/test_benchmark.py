@@ -1,6 +1,11 @@
 import typing
 
-from zntrack import Node, zn
+import pytest
+import yaml
+
+from zntrack import Node, config, write_graphs, zn
+from zntrack.utils import file_io, utils
+from zntrack.zn.plots import PlotsStream
 
 
 # Test basic functionality of a single Node
@@ -16,6 +21,11 @@ def test_InputOutput_write_graph(proj_path, benchmark):
     benchmark(InputOutput(input=25).write_graph, dry_run=True)
 
 
+def test_InputOutput_write_graphs(proj_path, benchmark):
+    nodes = [InputOutput(input=idx, name=f"InputOutput_{idx}") for idx in range(100)]
+    benchmark(write_graphs, nodes)
+
+
 def test_InputOutput_run_and_save(proj_path, benchmark):
     node = InputOutput(input=25)
     benchmark(node.run_and_save)
@@ -75,3 +85,67 @@ def test_NodeCollector_load_lazy(proj_path, benchmark):
     io_node_2.write_graph(run=True)
     NodeCollector(nodes=[io_node_1, io_node_2]).write_graph(run=True)
     benchmark(NodeCollector.load, lazy=True)
+
+
+# Test reading / writing a large params.yaml
+@pytest.fixture
+def large_params() -> dict:
+    return {
+        f"Node_{idx}": {
+            "param1": idx,
+            "param2": [idx, idx / 2, f"value_{idx}"],
+            "param3": {"path": f"nodes/Node_{idx}/file.txt", "flag": idx % 2 == 0},
+        }
+        for idx in range(5000)
+    }
+
+
+YAML_BACKENDS = {
+    "python": (yaml.SafeLoader, yaml.SafeDumper),
+    "libyaml": (getattr(yaml, "CSafeLoader", None), getattr(yaml, "CSafeDumper", None)),
+}
+
+
+@pytest.fixture(params=YAML_BACKENDS)
+def yaml_backend(request, monkeypatch):
+    loader, dumper = YAML_BACKENDS[request.param]
+    if loader is None:
+        pytest.skip("LibYAML is not available")
+    monkeypatch.setattr(file_io, "YAMLLoader", loader)
+    monkeypatch.setattr(file_io, "YAMLDumper", dumper)
+    # measure the parsing and not the file cache
+    monkeypatch.setattr(config, "file_cache", False)
+
+
+def test_write_params_yaml(tmp_path, benchmark, yaml_backend, large_params):
+    file = tmp_path / "params.yaml"
+    benchmark(file_io.write_file, file, large_params)
+
+
+def test_read_params_yaml(tmp_path, benchmark, yaml_backend, large_params):
+    file = tmp_path / "params.yaml"
+    file_io.write_file(file, large_params)
+    assert benchmark(file_io.read_file, file) == large_params
+
+
+def test_encode_dict(benchmark, large_params):
+    assert benchmark(utils.encode_dict, large_params) == large_params
+
+
+def test_decode_dict(benchmark, large_params):
+    assert benchmark(utils.decode_dict, large_params) == large_params
+
+
+@pytest.mark.parametrize("index", (True, False), ids=("index", "no_index"))
+@pytest.mark.parametrize("name", ("zntrack.json", "params.yaml"))
+def test_read_file_entry(tmp_path, benchmark, large_params, monkeypatch, index, name):
+    monkeypatch.setattr(config, "file_cache", False)
+    file = tmp_path / name
+    file_io.write_file(file, large_params, index=index)
+    assert benchmark(file_io.read_file_entry, file, "Node_42") == large_params["Node_42"]
+
+
+def test_plots_stream_append(tmp_path, benchmark):
+    stream = PlotsStream(tmp_path / "plots.csv", buffer_size=100)
+    benchmark(stream.append, step=1, loss=0.5)
+    stream.flush()
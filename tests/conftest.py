@@ -10,6 +10,14 @@ import subprocess
 
 import pytest
 
+from zntrack.utils import file_io
+
+
+@pytest.fixture(autouse=True)
+def clear_file_cache():
+    """Tests can mock 'pathlib.Path.open', so start each test with an empty cache"""
+    file_io.file_cache.clear()
+
 
 @pytest.fixture
 def proj_path(tmp_path, request) -> pathlib.Path:
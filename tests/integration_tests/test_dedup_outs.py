@@ -0,0 +1,72 @@
+import os
+import pathlib
+import subprocess
+
+import numpy as np
+import pytest
+
+from zntrack import Node, config, zn
+
+
+class SweepNode(Node):
+    seed = zn.params()
+    result = zn.outs()
+    array = zn.outs(format="npy")
+
+    def run(self):
+        self.result = {"energy": [1.0, 2.0]}
+        self.array = np.ones(100)
+
+
+@pytest.fixture
+def content_store(monkeypatch) -> pathlib.Path:
+    monkeypatch.setattr(config, "content_store", pathlib.Path(".zntrack", "store"))
+    return config.content_store
+
+
+def test_content_store_sweep(proj_path, content_store):
+    for seed in range(3):
+        node = SweepNode(seed=seed, name=f"SweepNode_{seed}")
+        node.write_graph()
+        # 'dvc repro' would replace the outputs with copies from the DVC cache
+        node.run_and_save()
+
+    for name in ("outs.json", "array.npy"):
+        files = [pathlib.Path("nodes", f"SweepNode_{seed}", name) for seed in range(3)]
+        assert all(os.path.samefile(files[0], file) for file in files)
+    assert len(list(content_store.glob("*/*"))) == 2
+    assert SweepNode.load(name="SweepNode_2").result == {"energy": [1.0, 2.0]}
+
+    # DVC replaces the read-only files when running the stages again
+    subprocess.check_call(["dvc", "repro", "-f", "SweepNode_1"])
+    assert SweepNode.load(name="SweepNode_1").result == {"energy": [1.0, 2.0]}
+
+
+def test_content_store_dvc_repro(proj_path, content_store, monkeypatch):
+    for seed in range(3):
+        SweepNode(seed=seed, name=f"SweepNode_{seed}").write_graph()
+    monkeypatch.setattr(config, "content_store", None)
+    # the stages run in new processes, which use the store saved by write_graph
+    subprocess.check_call(["dvc", "repro"])
+
+    assert len(list(content_store.glob("*/*"))) == 2
+    for seed in range(3):
+        assert SweepNode.load(name=f"SweepNode_{seed}").result == {"energy": [1.0, 2.0]}
+
+
+class UpdateMetricsNode(Node):
+    metrics = zn.metrics()
+
+    def run(self):
+        for epoch in range(10):
+            self.update_metrics(epoch=epoch)
+
+
+def test_content_store_update_metrics(proj_path, content_store):
+    node = UpdateMetricsNode()
+    node.write_graph()
+    node.run_and_save()
+
+    # only the final metrics are stored
+    assert len(list(content_store.glob("*/*"))) == 1
+    assert UpdateMetricsNode.load().metrics == {"epoch": 9}
@@ -1,4 +1,6 @@
 """Test using the ZnTrack Nodes without DVC"""
+import json
+import pathlib
 import random
 
 import pandas as pd
@@ -81,3 +83,54 @@ def test_run_and_save_mp(proj_path):
 
     assert mp_loaded.metrics == {"a": 100}
     assert pd.DataFrame([{"b": 1}, {"b": 2}]).equals(mp_loaded.plots)
+
+
+class UpdateMetrics(Node):
+    metrics = zn.metrics()
+    outs = zn.outs()
+
+    def run(self):
+        self.outs = "outs"
+        for epoch in range(3):
+            self.update_metrics(epoch=epoch, loss=1 / (epoch + 1))
+            assert json.loads(self.metrics_file.read_text())["metrics"]["epoch"] == epoch
+        self.update_metrics(accuracy=0.9)
+
+    @property
+    def metrics_file(self) -> pathlib.Path:
+        return pathlib.Path("nodes", self.node_name, "metrics_no_cache.json")
+
+
+def test_update_metrics(proj_path):
+    node = UpdateMetrics()
+    node.run_and_save()
+    assert node.metrics == {"epoch": 2, "loss": 1 / 3, "accuracy": 0.9}
+    assert UpdateMetrics.load().metrics == {"epoch": 2, "loss": 1 / 3, "accuracy": 0.9}
+
+    # a new run starts with empty metrics
+    node = UpdateMetrics()
+    node.update_metrics(loss=0.5)
+    assert json.loads(node.metrics_file.read_text())["metrics"] == {"loss": 0.5}
+
+    with pytest.raises(ValueError):
+        node.update_metrics("outs", loss=0.5)
+
+
+class UpdateMultipleMetrics(Node):
+    train = zn.metrics()
+    test = zn.metrics()
+
+    def run(self):
+        self.update_metrics("train", loss=0.1)
+        self.update_metrics("test", loss=0.2)
+
+
+def test_update_multiple_metrics(proj_path):
+    node = UpdateMultipleMetrics()
+    node.run_and_save()
+    node = UpdateMultipleMetrics.load()
+    assert node.train == {"loss": 0.1}
+    assert node.test == {"loss": 0.2}
+
+    with pytest.raises(ValueError):
+        UpdateMultipleMetrics().update_metrics(loss=0.3)
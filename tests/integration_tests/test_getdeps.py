@@ -5,6 +5,7 @@ import subprocess
 import numpy as np
 import pytest
 
+import zntrack
 from zntrack import getdeps, utils, zn
 from zntrack.core import ZnTrackOption
 from zntrack.core.base import Node
@@ -166,6 +167,19 @@ def test_get_origin(proj_path):
     assert node_attr.name == "SeedNumber"
 
 
+def test_get_origin_not_lazy(proj_path, monkeypatch):
+    sd = SeedNumber(inputs=20)
+    sd.write_graph()
+    ModifyNumber(inputs=getdeps(sd, "number")).write_graph()
+    # without lazy loading, the zn.deps are loaded immediately
+    subprocess.check_call(["dvc", "repro"])
+
+    monkeypatch.setattr(zntrack.config, "lazy", False)
+    node_attr = get_origin(ModifyNumber.load(), "inputs")
+    assert isinstance(node_attr, NodeAttribute)
+    assert node_attr.name == "SeedNumber"
+
+
 def test_get_origin_lst(proj_path):
     sd = SeedNumber(inputs=20)
     sd.write_graph()
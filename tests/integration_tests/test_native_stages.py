@@ -0,0 +1,101 @@
+import pathlib
+import shutil
+import subprocess
+
+import pandas as pd
+import pytest
+
+from zntrack import Node, config, dvc, meta, utils, zn
+
+
+class DVCOutputs(Node):
+    """Node with all dvc.<option> outputs"""
+
+    params = dvc.params("parameters.yaml")
+    deps = dvc.deps(["b.txt", "a.txt"])
+    outs = dvc.outs([utils.nwd / "z.txt", utils.nwd / "y.txt"])
+    outs_no_cache = dvc.outs_no_cache(utils.nwd / "outs_no_cache.txt")
+    checkpoints = dvc.checkpoints(utils.nwd / "checkpoints.txt")
+    metrics = dvc.metrics(utils.nwd / "metrics.json")
+    metrics_no_cache = dvc.metrics_no_cache(utils.nwd / "metrics_no_cache.json")
+    plots = dvc.plots(utils.nwd / "plots.csv", x="a", y="b", title="T", no_header=True)
+    plots_no_cache = dvc.plots_no_cache(utils.nwd / "plots_no_cache.csv")
+
+
+class ZnOutputs(Node):
+    param = zn.params(1)
+    outs = zn.outs()
+    metrics = zn.metrics()
+    plots = zn.plots(template="linear", x_label="step")
+    plots_no_cache = zn.plots(cache=False)
+    author = meta.Text("ZnTrack")
+
+    def run(self):
+        self.outs = self.param
+        self.metrics = {"param": self.param}
+        self.plots = pd.DataFrame({"value": [self.param]})
+        self.plots_no_cache = pd.DataFrame({"value": [self.param]})
+
+
+class NodeDeps(Node):
+    deps = zn.deps()
+    method = zn.Method()
+    result = zn.outs()
+
+
+class Method:
+    def __init__(self, value):
+        self.value = value
+
+
+def write_graph(native: bool, **kwargs) -> dict:
+    """Write the graph and collect the files written for the stages"""
+    for path in ["dvc.yaml", "params.yaml", "zntrack.json", "nodes"]:
+        path = pathlib.Path(path)
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink(missing_ok=True)
+    pathlib.Path("parameters.yaml").write_text("a: 1\n")
+
+    config.native_stages = native
+    try:
+        zn_outputs = ZnOutputs()
+        zn_outputs.write_graph(**kwargs)
+        DVCOutputs().write_graph(**kwargs)
+        NodeDeps(deps=[zn_outputs, zn_outputs @ "outs"], method=Method(1)).write_graph(
+            **kwargs
+        )
+    finally:
+        config.native_stages = False
+
+    files = {
+        file: utils.file_io.read_file(pathlib.Path(file))
+        for file in ["dvc.yaml", "params.yaml", "zntrack.json"]
+    }
+    for file in pathlib.Path("nodes").rglob(".gitignore"):
+        # the order of the entries written by DVC is not deterministic
+        files[file.as_posix()] = sorted(file.read_text().splitlines())
+    return files
+
+
+@pytest.mark.parametrize("kwargs", ({}, {"always_changed": True, "write_desc": False}))
+def test_native_stages(proj_path, kwargs):
+    assert write_graph(native=True, **kwargs) == write_graph(native=False, **kwargs)
+
+
+def test_native_stages_dvc_status(proj_path):
+    write_graph(native=True)
+    # DVC can parse the stages
+    status = subprocess.run(
+        ["dvc", "status"], check=True, capture_output=True, text=True
+    ).stdout
+    for node_name in ["ZnOutputs", "DVCOutputs", "NodeDeps"]:
+        assert node_name in status
+
+
+def test_native_stages_run(proj_path, monkeypatch):
+    monkeypatch.setattr(config, "native_stages", True)
+    ZnOutputs(param=5).write_graph(run=True)
+    assert ZnOutputs.load().outs == 5
+    assert ZnOutputs.load().author == "ZnTrack"
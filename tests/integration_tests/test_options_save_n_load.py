@@ -1,4 +1,8 @@
+import json
 import pathlib
+import subprocess
+
+import numpy as np
 
 from zntrack import Node, dvc, zn
 
@@ -54,3 +58,158 @@ def test_params_and_deps(proj_path):
         pathlib.Path("test.json"),
         pathlib.Path("test2.json"),
     ]
+
+
+class CompactOutputs(Node):
+    outs = zn.outs(compact=True)
+    more_outs = zn.outs()
+    metrics = zn.metrics()
+
+    def run(self):
+        self.outs = list(range(10))
+        self.more_outs = {"a": "b"}
+        self.metrics = {"loss": 0.1}
+
+
+def test_compact_outs(proj_path):
+    CompactOutputs().write_graph(run=True)
+
+    outs = pathlib.Path("nodes", "CompactOutputs", "outs.json").read_text()
+    # all outs share the same file which is written compact
+    assert " " not in outs and "\n" not in outs
+    assert json.loads(outs) == {"outs": list(range(10)), "more_outs": {"a": "b"}}
+    metrics = pathlib.Path("nodes", "CompactOutputs", "metrics_no_cache.json")
+    assert metrics.read_text() == '{\n    "metrics": {\n        "loss": 0.1\n    }\n}'
+
+    node = CompactOutputs.load()
+    assert node.outs == list(range(10))
+    assert node.more_outs == {"a": "b"}
+
+
+class NumpyOutputs(Node):
+    array = zn.outs(format="npy")
+    arrays = zn.outs(format="npz")
+    outs = zn.outs()
+
+    def run(self):
+        self.array = np.arange(1000).reshape(100, 10)
+        self.arrays = {"a": np.ones(3)}
+        self.outs = "json"
+
+
+class NumpyOutputsSlice(Node):
+    data: NumpyOutputs = zn.deps()
+    result = zn.outs()
+
+    def __init__(self, data=None, **kwargs):
+        super().__init__(**kwargs)
+        self.data = data
+
+    def run(self):
+        self.result = self.data.array[5:7, 2].tolist()
+
+
+def test_numpy_outs(proj_path):
+    NumpyOutputs().write_graph(run=True)
+    NumpyOutputsSlice(data=NumpyOutputs.load()).write_graph(run=True)
+
+    assert pathlib.Path("nodes", "NumpyOutputs", "array.npy").exists()
+    assert pathlib.Path("nodes", "NumpyOutputs", "arrays.npz").exists()
+    assert json.loads(pathlib.Path("nodes", "NumpyOutputs", "outs.json").read_text()) == {
+        "outs": "json"
+    }
+
+    node = NumpyOutputs.load()
+    assert isinstance(node.array, np.memmap)
+    np.testing.assert_array_equal(node.array, np.arange(1000).reshape(100, 10))
+    np.testing.assert_array_equal(node.arrays["a"], np.ones(3))
+    assert node.outs == "json"
+    assert NumpyOutputsSlice.load().result == [52, 62]
+
+
+class CompressedOutputs(Node):
+    outs = zn.outs(compression="gzip")
+    plain_outs = zn.outs()
+
+    def run(self):
+        self.outs = list(range(100))
+        self.plain_outs = "plain"
+
+
+def test_compressed_outs(proj_path):
+    node = CompressedOutputs()
+    file = pathlib.Path("nodes", "CompressedOutputs", "outs.json.gz")
+    assert file in node.affected_files
+    node.write_graph(run=True)
+
+    assert file.exists()
+    assert json.loads(
+        pathlib.Path("nodes", "CompressedOutputs", "outs.json").read_text()
+    ) == {"plain_outs": "plain"}
+    node = CompressedOutputs.load()
+    assert node.outs == list(range(100))
+    assert node.plain_outs == "plain"
+
+
+class PickleOutputs(Node):
+    outs = zn.outs(format="pickle")
+
+    def run(self):
+        self.outs = {"array": np.arange(100_000), "values": {1, 2, 3}}
+
+
+def test_pickle_outs(proj_path):
+    PickleOutputs().write_graph()
+    subprocess.check_call(["dvc", "repro"])
+
+    directory = pathlib.Path("nodes", "PickleOutputs", "outs.pickle")
+    assert (directory / "buffer_0.bin").exists()
+    outs = PickleOutputs.load().outs
+    np.testing.assert_array_equal(outs["array"], np.arange(100_000))
+    assert outs["values"] == {1, 2, 3}
+
+
+class LazyOutputs(Node):
+    results = zn.outs(format="lazy")
+    trajectory = zn.outs(format="lazy")
+
+    def run(self):
+        self.results = {"energy": np.arange(10), "names": ["a", "b"]}
+        self.trajectory = list(range(2500))
+
+
+def test_lazy_outs(proj_path):
+    LazyOutputs().write_graph(run=True)
+
+    node = LazyOutputs.load()
+    assert list(node.results) == ["energy", "names"]
+    np.testing.assert_array_equal(node.results["energy"], np.arange(10))
+    assert node.results["names"] == ["a", "b"]
+    assert len(node.trajectory) == 2500
+    assert node.trajectory[1500:1503] == [1500, 1501, 1502]
+    assert pathlib.Path("nodes", "LazyOutputs", "trajectory.lazy", "2.json").exists()
+
+
+class AutoOutputs(Node):
+    small = zn.outs(format="auto")
+    large = zn.outs(format="auto")
+
+    def run(self):
+        self.small = {"energy": 1.0}
+        self.large = np.arange(300_000, dtype=float)
+
+
+def test_auto_outs(proj_path):
+    AutoOutputs().write_graph()
+    subprocess.check_call(["dvc", "repro"])
+
+    directory = pathlib.Path("nodes", "AutoOutputs")
+    assert json.loads((directory / "small.auto" / "data.json").read_text()) == {
+        "energy": 1.0
+    }
+    assert (directory / "large.auto" / "data.npy").exists()
+
+    node = AutoOutputs.load()
+    assert node.small == {"energy": 1.0}
+    assert isinstance(node.large, np.memmap)
+    np.testing.assert_array_equal(node.large, np.arange(300_000, dtype=float))
@@ -0,0 +1,138 @@
+import json
+import os
+import pathlib
+import subprocess
+import time
+
+import pytest
+
+import zntrack
+from zntrack import Node, dvc, utils, zn
+from zntrack.core import executor
+
+
+class WriteNumber(Node):
+    number = zn.params()
+    file = dvc.outs(utils.nwd / "number.txt")
+
+    def run(self):
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.file.write_text(str(self.number))
+
+
+class ReadFile(Node):
+    file = dvc.deps()
+    number = zn.outs()
+
+    def run(self):
+        self.number = int(pathlib.Path(self.file).read_text())
+
+
+class AddNumbers(Node):
+    inputs = zn.deps()
+    result = zn.outs()
+
+    def run(self):
+        self.result = sum(node.number for node in self.inputs)
+
+
+@pytest.fixture
+def nodes(proj_path):
+    write_number = WriteNumber(number=5)
+    read_file = ReadFile(file=write_number.file)
+    add_numbers = AddNumbers(inputs=[read_file])
+    return [add_numbers, read_file, write_number]
+
+
+def test_get_graph(nodes):
+    for node in reversed(nodes):
+        node.write_graph()
+    assert executor.get_graph(nodes) == {
+        "AddNumbers": {"ReadFile"},
+        "ReadFile": {"WriteNumber"},
+        "WriteNumber": set(),
+    }
+
+
+def test_run_nodes(nodes):
+    for node in reversed(nodes):
+        node.write_graph()
+    zntrack.run_nodes(nodes)
+
+    assert ReadFile.load().number == 5
+    assert AddNumbers.load().result == 5
+    # the stages are up to date for DVC
+    status = subprocess.run(
+        ["dvc", "status", "--json"], check=True, capture_output=True, text=True
+    )
+    assert json.loads(status.stdout) == {}
+
+
+class WaitForOthers(Node):
+    """Only finishes if all Nodes of the fan-out run at the same time"""
+
+    n_nodes = zn.params()
+    pid = zn.outs()
+
+    def run(self):
+        marker = pathlib.Path("started", self.node_name)
+        marker.parent.mkdir(exist_ok=True)
+        marker.touch()
+        start = time.time()
+        while len(list(marker.parent.iterdir())) < self.n_nodes:
+            if time.time() - start > 60:
+                raise TimeoutError("The Nodes are not running in parallel")
+            time.sleep(0.05)
+        self.pid = os.getpid()
+
+
+def test_run_nodes_parallel(nodes):
+    nodes += [WaitForOthers(n_nodes=4, name=f"WaitForOthers_{idx}") for idx in range(4)]
+    for node in reversed(nodes):
+        node.write_graph()
+    zntrack.run_nodes(nodes, parallel=True, max_workers=4)
+
+    assert AddNumbers.load().result == 5
+    pids = {WaitForOthers.load(name=f"WaitForOthers_{idx}").pid for idx in range(4)}
+    assert len(pids) == 4
+    assert os.getpid() not in pids
+
+
+class FailingNode(Node):
+    outs = zn.outs()
+
+    def run(self):
+        raise ValueError("failed")
+
+
+def test_run_nodes_parallel_error(nodes):
+    nodes.append(FailingNode())
+    for node in reversed(nodes):
+        node.write_graph()
+    with pytest.raises(ValueError, match="failed"):
+        zntrack.run_nodes(nodes, parallel=True)
+
+
+class WaitForOthersThread(WaitForOthers):
+    execution = "thread"
+
+
+def test_run_nodes_thread(nodes):
+    nodes += [
+        WaitForOthersThread(n_nodes=4, name=f"WaitForOthers_{idx}") for idx in range(4)
+    ]
+    for node in reversed(nodes):
+        node.write_graph()
+    zntrack.run_nodes(nodes, parallel=True, max_workers=4)
+
+    assert AddNumbers.load().result == 5
+    for idx in range(4):
+        assert WaitForOthersThread.load(name=f"WaitForOthers_{idx}").pid == os.getpid()
+
+
+def test_run_nodes_execution_error(nodes):
+    write_number = nodes[-1]
+    write_number.execution = "unknown"
+    write_number.write_graph()
+    with pytest.raises(ValueError, match="Unknown execution"):
+        zntrack.run_nodes([write_number], parallel=True)
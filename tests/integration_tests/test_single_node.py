@@ -6,7 +6,7 @@ import subprocess
 import pytest
 import yaml
 
-from zntrack import dvc, zn
+from zntrack import config, dvc, utils, zn
 from zntrack.core.base import Node
 from zntrack.utils.exceptions import DVCProcessError
 
@@ -375,3 +375,47 @@ def test__graph_entry_exists(proj_path):
 
     assert ExampleNode01.load()._graph_entry_exists is False
     assert ExampleNode01["TestNode"]._graph_entry_exists
+
+
+def test_sharded_config(proj_path, monkeypatch):
+    monkeypatch.setattr(config, "sharded_config", True)
+    ExampleNode01(inputs="Lorem Ipsum").write_graph(run=True)
+
+    assert not pathlib.Path("params.yaml").exists()
+    assert not pathlib.Path("zntrack.json").exists()
+    params = yaml.safe_load(pathlib.Path("nodes/ExampleNode01/params.yaml").read_text())
+    assert params == {"ExampleNode01": {"inputs": "Lorem Ipsum"}}
+    dvc_yaml = yaml.safe_load(pathlib.Path("dvc.yaml").read_text())
+    assert dvc_yaml["stages"]["ExampleNode01"]["params"] == [
+        {"nodes/ExampleNode01/params.yaml": ["ExampleNode01"]}
+    ]
+
+    # shards are found without 'config.sharded_config'
+    monkeypatch.setattr(config, "sharded_config", False)
+    assert ExampleNode01.load().outputs == "Lorem Ipsum"
+
+    ExampleNode01(inputs="Dolor Sit").write_graph()
+    assert not pathlib.Path("nodes/ExampleNode01/params.yaml").exists()
+    assert ExampleNode01.load().inputs == "Dolor Sit"
+
+    # the entries in the global files are removed when sharding again
+    ExampleNode01(inputs="Lorem Ipsum", name="Node2").write_graph()
+    monkeypatch.setattr(config, "sharded_config", True)
+    ExampleNode01(inputs="Amet").write_graph()
+    params = utils.file_io.read_file(pathlib.Path("params.yaml"))
+    assert params == {"Node2": {"inputs": "Lorem Ipsum"}}
+    assert "ExampleNode01" not in utils.file_io.read_file(pathlib.Path("zntrack.json"))
+    assert ExampleNode01.load().inputs == "Amet"
+
+
+def test_config_index(proj_path, monkeypatch):
+    monkeypatch.setattr(config, "config_index", True)
+    ExampleNode01(inputs="Lorem Ipsum").write_graph(run=True)
+    ExampleNode01(inputs="Dolor Sit", name="Node2").write_graph(run=True)
+
+    # the index is not tracked by git
+    assert pathlib.Path(".dvc", "tmp", "zntrack-index", "params.yaml.index").exists()
+    assert not pathlib.Path(".params.yaml.index").exists()
+    assert ExampleNode01.load().outputs == "Lorem Ipsum"
+    assert ExampleNode01.load(name="Node2").inputs == "Dolor Sit"
+    assert ExampleNode01.load(name="Node2").outputs == "Dolor Sit"
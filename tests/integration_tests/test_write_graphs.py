@@ -0,0 +1,110 @@
+import pathlib
+import shutil
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import zntrack
+from zntrack import Node, dvc, meta, utils, zn
+
+
+class WriteNumbers(Node):
+    """Write some numbers"""
+
+    size = zn.params()
+    author = meta.Text("ZnTrack")
+    numbers = zn.outs()
+    file = dvc.outs(utils.nwd / "numbers.txt")
+    plots = zn.plots(x="index", y="value")
+
+    def run(self):
+        self.numbers = list(range(self.size))
+        self.file.write_text(str(self.numbers))
+        self.plots = pd.DataFrame({"value": self.numbers})
+
+
+class SumNumbers(Node):
+    numbers = zn.deps()
+    result = zn.metrics()
+
+    def run(self):
+        self.result = {"sum": sum(self.numbers.numbers)}
+
+
+def get_nodes():
+    nodes = [WriteNumbers(size=idx + 1, name=f"WriteNumbers_{idx}") for idx in range(3)]
+    nodes += [SumNumbers(numbers=node, name=f"Sum_{node.node_name}") for node in nodes]
+    return nodes
+
+
+def get_files() -> dict:
+    files = {
+        file: utils.file_io.read_file(pathlib.Path(file))
+        for file in ["dvc.yaml", "params.yaml", "zntrack.json"]
+    }
+    for file in pathlib.Path("nodes").rglob(".gitignore"):
+        # the order of the entries written by DVC is not deterministic
+        files[file.as_posix()] = sorted(file.read_text().splitlines())
+    return files
+
+
+def test_write_graphs(proj_path):
+    for node in get_nodes():
+        node.write_graph()
+    expected = get_files()
+
+    for file in ["dvc.yaml", "params.yaml", "zntrack.json"]:
+        pathlib.Path(file).unlink()
+    shutil.rmtree("nodes")
+
+    with patch.object(
+        utils.file_io, "write_file", wraps=utils.file_io.write_file
+    ) as write_mock:
+        zntrack.write_graphs(get_nodes())
+    written = [call.args[0] for call in write_mock.call_args_list]
+    for file in [utils.Files.dvc, utils.Files.params, utils.Files.zntrack]:
+        assert written.count(file) == 1
+
+    assert get_files() == expected
+
+
+def test_write_graphs_run(proj_path):
+    zntrack.write_graphs(get_nodes(), run=True)
+    for idx in range(3):
+        assert SumNumbers.load(name=f"Sum_WriteNumbers_{idx}").result == {
+            "sum": sum(range(idx + 1))
+        }
+
+
+def test_write_graphs_no_force(proj_path):
+    zntrack.write_graphs(get_nodes())
+    with pytest.raises(utils.exceptions.DVCProcessError):
+        zntrack.write_graphs(get_nodes(), force=False)
+
+
+class Params(Node):
+    _hash = zn.Hash()
+    value = zn.params()
+
+
+class UseParams(Node):
+    params: Params = zn.Nodes()
+    result = zn.outs()
+
+    def run(self):
+        self.result = self.params.value * 2
+
+
+def test_write_graphs_zn_nodes(proj_path):
+    zntrack.write_graphs(
+        [
+            UseParams(params=Params(value=idx), name=f"UseParams_{idx}")
+            for idx in range(2)
+        ],
+        run=True,
+    )
+    for idx in range(2):
+        node = UseParams.load(name=f"UseParams_{idx}")
+        assert node.params.value == idx
+        assert node.result == 2 * idx
@@ -0,0 +1,42 @@
+import pathlib
+import subprocess
+
+import numpy as np
+import pytest
+
+from zntrack import Node, zn
+from zntrack.zn.arrays import ChunkedArray
+
+
+class StreamArrays(Node):
+    steps = zn.params(10)
+    positions = zn.arrays(chunk_size=4)
+    energies = zn.arrays()
+
+    def run(self):
+        for step in range(self.steps):
+            self.positions.append(np.full(3, step))
+        self.energies = np.arange(self.steps, dtype=float)
+
+
+@pytest.mark.parametrize("eager", (True, False))
+def test_stream_arrays(proj_path, eager):
+    StreamArrays().write_graph(run=eager)
+    if not eager:
+        subprocess.check_call(["dvc", "repro"])
+
+    directory = pathlib.Path("nodes", "StreamArrays", "positions.arrays")
+    assert len(list(directory.glob("chunk_*.npy"))) == 3
+
+    node = StreamArrays.load()
+    assert isinstance(node.positions, ChunkedArray)
+    assert node.positions.shape == (10, 3)
+    np.testing.assert_array_equal(node.positions[5:7], [[5, 5, 5], [6, 6, 6]])
+    np.testing.assert_array_equal(node.energies, np.arange(10, dtype=float))
+
+
+def test_arrays_dvc_out(proj_path):
+    node = StreamArrays()
+    assert (
+        pathlib.Path("nodes", "StreamArrays", "positions.arrays") in node.affected_files
+    )
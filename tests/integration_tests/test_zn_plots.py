@@ -163,3 +163,146 @@ def test_WritePlotsModifyDVC(proj_path):
 def test_write_plots_modify_lists(proj_path):
     with pytest.raises(ValueError):
         WritePlotsModifyDVC(plots=["a.csv", "b.csv"]).write_graph()
+
+
+class WriteColumnarPlots(Node):
+    parquet = zn.plots(format="parquet", x="step", y="loss")
+    feather = zn.plots(format="feather", view="json")
+    no_view = zn.plots(format="parquet", view=None, cache=False)
+
+    def run(self):
+        data = pd.DataFrame(
+            {
+                "step": list(range(100)),
+                "loss": [1 / (x + 1) for x in range(100)],
+                "label": pd.Categorical(["a", "b"] * 50),
+            }
+        )
+        data.index.name = "my_index"
+        self.parquet = data
+        self.feather = data
+        self.no_view = data
+
+
+def test_write_columnar_plots(proj_path):
+    pytest.importorskip("pyarrow")
+    WriteColumnarPlots().write_graph(run=True)
+    subprocess.check_call(["dvc", "plots", "show"])
+
+    nwd = pathlib.Path("nodes", "WriteColumnarPlots")
+    stage = yaml.safe_load(pathlib.Path("dvc.yaml").read_text())["stages"][
+        "WriteColumnarPlots"
+    ]
+    assert sorted(stage["plots"], key=str) == sorted(
+        [
+            {(nwd / "parquet.csv").as_posix(): {"x": "step", "y": "loss"}},
+            (nwd / "feather.json").as_posix(),
+        ],
+        key=str,
+    )
+    assert (nwd / "parquet.parquet").as_posix() in stage["outs"]
+    assert {(nwd / "no_view.parquet").as_posix(): {"cache": False}} in stage["outs"]
+    assert not (nwd / "no_view.csv").exists()
+
+    node = WriteColumnarPlots.load()
+    for name in ["parquet", "feather", "no_view"]:
+        data = getattr(node, name)
+        assert data.index.name == "my_index"
+        assert data["label"].dtype == "category"
+        assert data["loss"].iloc[1] == 0.5
+
+    loss = WriteColumnarPlots.feather.read(node, columns=["loss"])
+    assert list(loss.columns) == ["loss"]
+    assert loss.index.name == "my_index"
+    assert WriteColumnarPlots.parquet.read(node, columns=["step"])["step"].sum() == 4950
+
+
+def test_plots_format_errors():
+    with pytest.raises(ValueError):
+        zn.plots(format="hdf5")
+    with pytest.raises(ValueError):
+        zn.plots(format="parquet", view="png")
+
+
+class StreamPlots(Node):
+    steps = zn.params(5)
+    plots = zn.plots(append=True)
+
+    def run(self):
+        for step in range(self.steps):
+            self.plots.append(step=step, loss=1 / (step + 1))
+
+
+@pytest.mark.parametrize("eager", (True, False))
+def test_stream_plots(proj_path, eager):
+    StreamPlots(steps=3).write_graph(run=eager)
+    if not eager:
+        subprocess.check_call(["dvc", "repro"])
+
+    file = pathlib.Path("nodes", "StreamPlots", "plots.csv")
+    assert file.read_text().splitlines() == [
+        "index,step,loss",
+        "0,0,1.0",
+        "1,1,0.5",
+        "2,2,0.3333333333333333",
+    ]
+
+    plots = StreamPlots.load().plots
+    assert isinstance(plots, pd.DataFrame)
+    assert plots.index.name == "index"
+    assert plots["step"].tolist() == [0, 1, 2]
+
+
+def test_stream_plots_flush(proj_path):
+    node = StreamPlots()
+    node.plots.buffer_size = 2
+    file = pathlib.Path("nodes", "StreamPlots", "plots.csv")
+
+    node.plots.append({"step": 0, "loss": 1.0})
+    assert not file.exists()
+    node.plots.append(step=1)
+    assert len(file.read_text().splitlines()) == 3
+    node.plots.append(step=2, loss=0.5)
+    assert len(node.plots) == 3
+
+    node.save_plots()
+    df = pd.read_csv(file, index_col=0)
+    assert df["step"].tolist() == [0, 1, 2]
+    assert df["loss"].isna().tolist() == [False, True, False]
+
+    with pytest.raises(ValueError):
+        node.plots.append(epoch=3)
+
+
+def test_stream_plots_flush_before_append(proj_path):
+    node = StreamPlots()
+    file = pathlib.Path("nodes", "StreamPlots", "plots.csv")
+
+    # e.g. 'save_plots' before the first epoch
+    node.save_plots()
+    assert file.read_text() == "index\n"
+    node.plots.append(loss=0.1)
+    node.plots.append(loss=0.2)
+    node.save_plots()
+    assert node.plots.to_dataframe()["loss"].tolist() == [0.1, 0.2]
+
+
+class DataFramePlots(Node):
+    plots = zn.plots()
+
+    def run(self):
+        self.plots = pd.DataFrame({"step": [0, 1], "loss": [1.0, 0.5]})
+
+
+def test_stream_plots_load_like_dataframe(proj_path):
+    StreamPlots(steps=2).run_and_save()
+    DataFramePlots().run_and_save()
+
+    stream, dataframe = StreamPlots.load().plots, DataFramePlots.load().plots
+    assert stream.index.name == dataframe.index.name
+    pd.testing.assert_frame_equal(stream, dataframe)
+
+
+def test_stream_plots_format_error():
+    with pytest.raises(ValueError):
+        zn.plots(append=True, format="parquet")
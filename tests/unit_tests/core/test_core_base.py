@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, call, mock_open, patch
 import pytest
 import yaml
 
-from zntrack import dvc, utils, zn
+from zntrack import config, dvc, utils, zn
 from zntrack.core.base import (
     LoadViaGetItem,
     Node,
@@ -14,6 +14,12 @@ from zntrack.core.base import (
 )
 
 
+@pytest.fixture(autouse=True)
+def non_atomic_writes(monkeypatch):
+    """Write directly to the mocked 'pathlib.Path.open' instead of a temporary file"""
+    monkeypatch.setattr(config, "atomic_writes", False)
+
+
 class ExampleDVCOutsNode(Node):
     outs = dvc.outs("example.dat")
 
@@ -75,27 +81,52 @@ def test_save(run):
         else:
             example.save()
             assert not zn_outs_mock().write.called
+            # every file is written only once
             assert zntrack_mock().write.mock_calls == [
-                call(json.dumps({})),  # clear everything first
                 call(
                     json.dumps(
-                        {"ExampleFullNode": {"deps": "deps.inp"}},
-                        indent=4,
-                    )
-                ),
-                call(
-                    json.dumps(
-                        {"ExampleFullNode": {"dvc_outs": "file.txt"}},
+                        {
+                            "ExampleFullNode": {
+                                "deps": "deps.inp",
+                                "dvc_outs": "file.txt",
+                            }
+                        },
                         indent=4,
                     )
                 ),
             ]
             assert params_mock().write.mock_calls == [
-                call(yaml.safe_dump({})),  # clear everything first
                 call(yaml.safe_dump({"ExampleFullNode": {"params": 10}}, indent=4)),
             ]
 
 
+def test_save_no_batch():
+    zntrack_mock = mock_open(read_data="{}")
+    params_mock = mock_open(read_data="{}")
+
+    example = ExampleFullNode()
+
+    def pathlib_open(*args, **kwargs):
+        if args[0] == pathlib.Path("zntrack.json"):
+            return zntrack_mock(*args, **kwargs)
+        elif args[0] == pathlib.Path("params.yaml"):
+            return params_mock(*args, **kwargs)
+        else:
+            raise ValueError(args)
+
+    with patch.object(pathlib.Path, "open", pathlib_open):
+        example.save(batch=False)
+    assert zntrack_mock().write.mock_calls == [
+        call(json.dumps({})),  # clear everything first
+        call(json.dumps({"ExampleFullNode": {"deps": "deps.inp"}}, indent=4)),
+        call(json.dumps({"ExampleFullNode": {"dvc_outs": "file.txt"}}, indent=4)),
+    ]
+    assert params_mock().write.mock_calls == [
+        call(yaml.safe_dump({})),  # clear everything first
+        call(yaml.safe_dump({"ExampleFullNode": {"params": 10}}, indent=4)),
+    ]
+
+
 def test_save_only_hash():
     zntrack_mock = mock_open(read_data="{}")
     params_mock = mock_open(read_data="{}")
@@ -339,6 +370,20 @@ def test_write_graph():
     ]
 
 
+class CompressedOutsNode(Node):
+    outs = zn.outs(compression="lzma")
+
+
+def test_write_graph_compression():
+    example = CompressedOutsNode()
+    assert example.affected_files == {
+        pathlib.Path("nodes", "CompressedOutsNode", "outs.json.xz")
+    }
+    with patch.object(CompressedOutsNode, "save"):
+        script = example.write_graph(dry_run=True)
+    assert script[5:8] == ["--force", "--outs", "nodes/CompressedOutsNode/outs.json.xz"]
+
+
 def test__handle_nodes_as_methods():
     example = ExampleDVCOutsNode()
 
@@ -346,7 +391,18 @@ def test__handle_nodes_as_methods():
         _handle_nodes_as_methods({"example": example})
 
     write_graph_mock.assert_called_with(
-        run=True, call_args=f".load(name='{example.node_name}').save(hash_only=True)"
+        run=True,
+        call_args=f".load(name='{example.node_name}').save(hash_only=True)",
+        native=False,
+    )
+
+    with patch.object(ExampleDVCOutsNode, "write_graph") as write_graph_mock:
+        _handle_nodes_as_methods({"example": example}, native=True)
+    # the stage is run by 'dvc repro' of the main Node
+    write_graph_mock.assert_called_with(
+        run=False,
+        call_args=f".load(name='{example.node_name}').save(hash_only=True)",
+        native=True,
     )
 
     with patch.object(ExampleDVCOutsNode, "write_graph") as write_graph_mock:
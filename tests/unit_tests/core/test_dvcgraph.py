@@ -7,9 +7,12 @@ from zntrack.core.base import handle_deps
 from zntrack.core.dvcgraph import (
     DVCRunOptions,
     ZnTrackInfo,
+    apply_post_dvc_cmd,
     filter_ZnTrackOption,
+    get_ignored_files,
     handle_dvc,
     prepare_dvc_script,
+    prepare_dvc_stage,
 )
 
 
@@ -220,6 +223,63 @@ def test_prepare_dvc_script():
     ]
 
 
+def test_prepare_dvc_stage():
+    dvc_run_option = DVCRunOptions(
+        no_commit=False,
+        external=False,
+        always_changed=True,
+        no_run_cache=False,
+        force=True,
+    )
+    custom_args = ["--deps", "b.txt", "--deps", "a.txt", "--params", "params.yaml:Z"]
+    custom_args += ["--params", "params.yaml:A", "--params", "other.yaml:"]
+    custom_args += ["--params", "p2.yaml:k", "--outs", "z.txt"]
+    custom_args += ["--outs-no-cache", "sub/y.txt", "--checkpoints", "w.txt"]
+    custom_args += ["--metrics", "m.json", "--metrics-no-cache", "m2.json"]
+    custom_args += ["--plots", "p.csv", "--plots-no-cache", "sub/p2.csv"]
+
+    stage = prepare_dvc_stage(
+        node_name="node01",
+        dvc_run_option=dvc_run_option,
+        custom_args=custom_args,
+        nb_name=None,
+        module="src.file",
+        func_or_cls="MyNode",
+        call_args=".load().run_and_save()",
+    )
+    apply_post_dvc_cmd(
+        stage,
+        ["dvc", "plots", "modify", "p.csv", "-x", "a", "--title", "T", "--no-header"],
+    )
+
+    # the same stage 'dvc stage add' and 'dvc plots modify' would write
+    assert stage == {
+        "cmd": (
+            f'{utils.get_python_interpreter()} -c "from src.file import MyNode;'
+            ' MyNode.load().run_and_save()" '
+        ),
+        "deps": ["a.txt", "b.txt"],
+        "params": ["A", "Z", {"other.yaml": None}, {"p2.yaml": ["k"]}],
+        "outs": [
+            {"sub/y.txt": {"cache": False}},
+            {"w.txt": {"checkpoint": True}},
+            "z.txt",
+        ],
+        "metrics": ["m.json", {"m2.json": {"cache": False}}],
+        "plots": [
+            {"p.csv": {"x": "a", "title": "T", "header": False}},
+            {"sub/p2.csv": {"cache": False}},
+        ],
+        "always_changed": True,
+    }
+    assert get_ignored_files(stage) == [
+        pathlib.Path(x) for x in ("w.txt", "z.txt", "m.json", "p.csv")
+    ]
+
+    with pytest.raises(ValueError):
+        apply_post_dvc_cmd(stage, ["dvc", "plots", "modify", "z.txt", "-x", "a"])
+
+
 def test_ZnTrackInfo():
     node = Node()
     assert isinstance(node.zntrack, ZnTrackInfo)
@@ -0,0 +1,15 @@
+import pytest
+
+from zntrack import exceptions
+from zntrack.core import executor
+
+
+def test_topological_sort():
+    graph = {"c": {"a", "b"}, "a": set(), "b": {"a"}, "d": set()}
+    assert executor.topological_sort(graph) == ["a", "d", "b", "c"]
+    assert executor.topological_sort({}) == []
+
+
+def test_topological_sort_cycle():
+    with pytest.raises(exceptions.CyclicGraphError):
+        executor.topological_sort({"a": {"b"}, "b": {"a"}, "c": set()})
@@ -0,0 +1,46 @@
+import pathlib
+
+import pytest
+
+from zntrack.utils import compression, file_io
+
+OPTIONAL_CODECS = {"zstd": "zstandard", "lz4": "lz4"}
+
+
+@pytest.fixture(params=list(compression.CODECS))
+def codec(request) -> compression.Codec:
+    if request.param in OPTIONAL_CODECS:
+        pytest.importorskip(OPTIONAL_CODECS[request.param])
+    return compression.get_codec(request.param)
+
+
+def test_get_codec():
+    assert compression.get_codec("gzip").suffix == ".gz"
+    with pytest.raises(ValueError):
+        compression.get_codec("zip")
+
+
+def test_get_file_codec():
+    assert compression.get_file_codec(pathlib.Path("outs.json")) is None
+    assert compression.get_file_codec(pathlib.Path("outs.json.gz")).name == "gzip"
+    assert compression.get_file_codec(pathlib.Path("outs.json.xz")).name == "lzma"
+
+
+def test_write_read_file(tmp_path, codec):
+    data = {"outs": list(range(1000)), "text": "ZnTrack " * 100}
+    file = tmp_path / f"outs.json{codec.suffix}"
+    file_io.write_file(file, data)
+
+    assert file.stat().st_size < len(file_io.json_engine.dumps(data))
+    assert file_io.read_file(file) == data
+
+    # the same content always results in the same file
+    content = file.read_bytes()
+    file_io.write_file(file, data)
+    assert file.read_bytes() == content
+
+
+def test_write_read_yaml(tmp_path):
+    file = tmp_path / "params.yaml.gz"
+    file_io.write_file(file, {"Node": {"param": 42}})
+    assert file_io.read_file(file) == {"Node": {"param": 42}}
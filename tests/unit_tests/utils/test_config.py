@@ -1,6 +1,8 @@
 import logging
+import pathlib
 
 from zntrack import config
+from zntrack.utils.config import Files
 
 
 def test_config_log_level():
@@ -10,3 +12,23 @@ def test_config_log_level():
     assert log.level == logging.DEBUG
     config.log_level = logging.ERROR
     assert log.level == logging.ERROR
+
+
+def test_files_get_node_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shard = pathlib.Path("nodes", "MyNode", "params.yaml")
+
+    assert Files.get_node_file(Files.params, "MyNode") == Files.params
+    assert Files.get_node_file(Files.dvc, "MyNode") == Files.dvc
+
+    monkeypatch.setattr(config, "sharded_config", True)
+    assert Files.get_node_file(Files.params, "MyNode") == shard
+    assert Files.get_node_file(Files.zntrack, "MyNode") == shard.with_name("zntrack.json")
+    assert Files.get_node_file(Files.dvc, "MyNode") == Files.dvc
+
+    monkeypatch.setattr(config, "sharded_config", False)
+    shard.parent.mkdir(parents=True)
+    shard.touch()
+    # existing shards are always used
+    assert Files.get_node_file(Files.params, "MyNode") == shard
+    assert Files.get_node_file(Files.zntrack, "MyNode") == Files.zntrack
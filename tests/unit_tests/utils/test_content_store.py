@@ -0,0 +1,68 @@
+import os
+import pathlib
+
+import pytest
+
+from zntrack import config
+from zntrack.utils import content_store, file_io
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> pathlib.Path:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "content_store", pathlib.Path(".zntrack", "store"))
+    return config.content_store
+
+
+def test_uses_store(store, monkeypatch):
+    assert content_store.uses_store(pathlib.Path("nodes", "A", "outs.json"))
+    assert not content_store.uses_store(pathlib.Path("nodes", "A", "params.yaml"))
+    assert not content_store.uses_store(pathlib.Path("params.yaml"))
+    monkeypatch.setattr(config, "content_store", None)
+    assert not content_store.uses_store(pathlib.Path("nodes", "A", "outs.json"))
+
+
+def test_save_store(store, monkeypatch):
+    content_store.save_store()
+    # e.g. a stage process of 'dvc repro' with the default config
+    monkeypatch.setattr(config, "content_store", None)
+    assert content_store.get_store() == store
+    assert content_store.uses_store(pathlib.Path("nodes", "A", "outs.json"))
+
+    content_store.save_store()
+    assert content_store.get_store() is None
+    assert not content_store.SETTINGS_FILE.exists()
+
+
+def test_write_file_content_store(store):
+    file_a = pathlib.Path("nodes", "A", "outs.json")
+    file_b = pathlib.Path("nodes", "B", "outs.json")
+    file_io.write_file(file_a, {"value": 42})
+    file_io.write_file(file_b, {"value": 42})
+
+    assert os.path.samefile(file_a, file_b)
+    assert file_a.stat().st_nlink == 3
+    assert file_a.stat().st_mode & 0o222 == 0
+    blob = content_store.get_blob(content_store.hash_file(file_a))
+    assert os.path.samefile(blob, file_a)
+    assert file_io.read_file(file_b) == {"value": 42}
+
+    # replacing a file does not modify the stored blob
+    file_io.write_file(file_b, {"value": 43})
+    assert not os.path.samefile(file_a, file_b)
+    assert file_io.read_file(file_a) == {"value": 42}
+    assert file_io.read_file(file_b) == {"value": 43}
+    assert len(list(store.glob("*/*"))) == 2
+
+
+def test_atomic_open_content_store(store):
+    file_a = pathlib.Path("nodes", "A", "data.bin")
+    file_a.parent.mkdir(parents=True)
+    for file in (file_a, pathlib.Path("params.bin")):
+        with file_io.atomic_open(file, "wb") as handle:
+            handle.write(b"data")
+
+    assert file_a.stat().st_nlink == 2
+    assert pathlib.Path("params.bin").stat().st_nlink == 1
+    assert len(list(store.glob("*/*"))) == 1
+    assert list(file_a.parent.iterdir()) == [file_a]
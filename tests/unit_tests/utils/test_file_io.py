@@ -1,12 +1,22 @@
 import json
+import multiprocessing
 import os
 import pathlib
+import threading
+import time
 from unittest.mock import mock_open, patch
 
 import pytest
 import yaml
 
-from zntrack.utils import file_io
+from zntrack import utils
+from zntrack.utils import config, file_io
+
+
+@pytest.fixture(autouse=True)
+def non_atomic_writes(monkeypatch):
+    """Write directly to the mocked 'pathlib.Path.open' instead of a temporary file"""
+    monkeypatch.setattr(config, "atomic_writes", False)
 
 
 def test_save_file_json():
@@ -278,3 +288,400 @@ def test_update_meta_existing():
     with patch.object(pathlib.Path, "open", pathlib_open):
         with pytest.raises(ValueError):
             file_io.update_meta(file=file, node_name="MyNode", data={"a": "b"})
+
+
+def test_config_transaction(tmp_path):
+    os.chdir(tmp_path)
+    file = pathlib.Path("params.yaml")
+    file_io.write_file(file, {"Node1": {"param1": 1}, "Node2": {"param1": 2}})
+
+    with patch.object(file_io, "write_file", wraps=file_io.write_file) as write_mock:
+        with file_io.config_transaction():
+            file_io.clear_config_file(file, node_name="Node1")
+            file_io.update_config_file(file, node_name="Node1", value_name="a", value=1)
+            with file_io.config_transaction():
+                file_io.update_config_file(
+                    file, node_name="Node1", value_name="b", value=2
+                )
+            # nothing is written before leaving the outermost transaction
+            assert not write_mock.called
+            assert file_io.read_file(file)["Node1"] == {"param1": 1}
+
+    write_mock.assert_called_once()
+    assert file_io.read_file(file) == {"Node1": {"a": 1, "b": 2}, "Node2": {"param1": 2}}
+
+
+def test_config_transaction_exception(tmp_path):
+    os.chdir(tmp_path)
+    file = pathlib.Path("params.yaml")
+    file_io.write_file(file, {"Node1": {"param1": 1}})
+
+    with pytest.raises(ValueError):
+        with file_io.config_transaction():
+            file_io.update_config_file(file, node_name="Node1", value_name="a", value=1)
+            raise ValueError
+
+    assert file_io.read_file(file) == {"Node1": {"param1": 1}}
+
+
+def test_config_transaction_thread(tmp_path):
+    file = tmp_path / "outs.json"
+
+    def update_in_thread():
+        file_io.update_config_file(file, node_name=None, value_name="b", value=2)
+
+    thread = threading.Thread(target=update_in_thread)
+    with file_io.config_transaction():
+        file_io.update_config_file(file, node_name=None, value_name="a", value=1)
+        # other threads do not join the transaction but wait for the file lock
+        thread.start()
+        thread.join(timeout=0.5)
+        assert thread.is_alive()
+        assert not file.exists()
+    thread.join()
+    assert file_io.read_file(file) == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize("json_indent", (4, 2, None))
+def test_write_file_compact(tmp_path, monkeypatch, json_indent):
+    monkeypatch.setattr(config, "json_indent", json_indent)
+    file = tmp_path / "outs.json"
+    data = {"outs": list(range(5)), "metrics": {"a": 1.5}}
+
+    file_io.write_file(file, data)
+    if json_indent is None:
+        assert file.read_text() == json.dumps(data, separators=(",", ":"))
+    else:
+        assert file.read_text() == json.dumps(data, indent=json_indent)
+    file_io.write_file(file, data, compact=True)
+    assert file.read_text() == json.dumps(data, separators=(",", ":"))
+    assert file_io.read_file(file) == data
+
+
+def test_config_transaction_compact(tmp_path):
+    file = tmp_path / "outs.json"
+    with file_io.config_transaction():
+        file_io.update_config_file(file, node_name=None, value_name="a", value=[1, 2])
+        file_io.update_config_file(
+            file, node_name=None, value_name="b", value=[3], compact=True
+        )
+    assert file.read_text() == '{"a":[1,2],"b":[3]}'
+
+
+@pytest.mark.parametrize("name", ("zntrack.json", "params.yaml"))
+@pytest.mark.parametrize("json_indent", (4, None))
+def test_write_file_index(tmp_path, monkeypatch, name, json_indent):
+    monkeypatch.setattr(config, "json_indent", json_indent)
+    file = tmp_path / name
+    data = {"Node1": {"a": [1, 2], "b": "x\ny"}, "Node2": {}, "Node3": {"c": None}}
+
+    file_io.write_file(file, data)
+    content = file.read_text()
+    assert not file_io.get_index_file(file).exists()
+
+    file_io.write_file(file, data, index=True)
+    # the index does not change the content
+    assert file.read_text() == content
+    assert file_io.get_index_file(file).exists()
+    for key, value in data.items():
+        assert file_io._read_indexed_entry(file, key) == {key: value}
+        assert file_io.read_file_entry(file, key) == value
+    with pytest.raises(KeyError):
+        file_io.read_file_entry(file, "Node4")
+
+
+def test_read_file_entry_outdated_index(tmp_path):
+    file = tmp_path / "zntrack.json"
+    file_io.write_file(file, {"Node1": {"a": 1}, "Node2": {"b": 2}}, index=True)
+
+    # modifications that do not use ZnTrack invalidate the index
+    file.write_text(json.dumps({"Node2": {"b": 3}, "Node1": {"a": 1}}))
+    assert file_io._read_indexed_entry(file, "Node2") is None
+    assert file_io.read_file_entry(file, "Node2") == {"b": 3}
+
+    # writing without index removes the old index
+    file_io.write_file(file, {"Node1": {"a": 1}}, index=True)
+    file_io.write_file(file, {"Node1": {"a": 2}})
+    assert not file_io.get_index_file(file).exists()
+    assert file_io.read_file_entry(file, "Node1") == {"a": 2}
+
+
+def test_update_config_file_index(tmp_path, monkeypatch):
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "config_index", True)
+    for file in (utils.Files.params, utils.Files.zntrack):
+        file_io.update_config_file(file, node_name="Node1", value_name="a", value=1)
+        assert file_io._read_indexed_entry(file, "Node1") == {"Node1": {"a": 1}}
+
+    # other files, e.g. outputs are not indexed
+    file = pathlib.Path("nodes", "Node1", "outs.json")
+    file_io.update_config_file(file, node_name=None, value_name="a", value=1)
+    assert not file_io.get_index_file(file).exists()
+
+
+def test_read_file_cache(tmp_path):
+    os.chdir(tmp_path)
+    file = pathlib.Path("zntrack.json")
+    file_io.write_file(file, {"Node1": {"param1": 1}})
+
+    with patch.object(file_io, "_parse_file", wraps=file_io._parse_file) as parse_mock:
+        content = file_io.read_file(file)
+        # modifying the content does not modify the cache
+        content["Node1"]["param1"] = 2
+        assert file_io.read_file(file) == {"Node1": {"param1": 1}}
+        assert parse_mock.call_count == 1
+
+        # writing the file invalidates the cache
+        file_io.write_file(file, {"Node1": {"param1": 3}})
+        assert file_io.read_file(file) == {"Node1": {"param1": 3}}
+        assert parse_mock.call_count == 2
+
+        # external modifications, e.g. by another process
+        file.write_text(json.dumps({"Node1": {"param1": 42}}))
+        assert file_io.read_file(file) == {"Node1": {"param1": 42}}
+        assert parse_mock.call_count == 3
+
+
+def test_read_file_cache_disabled(tmp_path, monkeypatch):
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "file_cache", False)
+    file = pathlib.Path("params.yaml")
+    file_io.write_file(file, {"Node1": {"param1": 1}})
+
+    with patch.object(file_io, "_parse_file", wraps=file_io._parse_file) as parse_mock:
+        file_io.read_file(file)
+        file_io.read_file(file)
+        assert parse_mock.call_count == 2
+    assert len(file_io.file_cache) == 0
+
+
+def test_read_file_cache_size(tmp_path, monkeypatch):
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "file_cache_size", 2)
+    for idx in range(4):
+        file = pathlib.Path("nodes", f"Node{idx}", "zntrack.json")
+        file_io.write_file(file, {"idx": idx})
+        assert file_io.read_file(file) == {"idx": idx}
+    assert len(file_io.file_cache) == 2
+
+
+def test_read_file_cache_outputs(tmp_path):
+    os.chdir(tmp_path)
+    file = pathlib.Path("nodes", "Node", "outs.json")
+    file_io.write_file(file, {"outs": list(range(10))})
+
+    # outputs are only read once, e.g. when loading a Node
+    assert file_io.read_file(file) == {"outs": list(range(10))}
+    assert len(file_io.file_cache) == 0
+
+
+@pytest.mark.parametrize(
+    ("loader", "dumper"),
+    [
+        (yaml.SafeLoader, yaml.SafeDumper),
+        (getattr(yaml, "CSafeLoader", None), getattr(yaml, "CSafeDumper", None)),
+    ],
+)
+def test_yaml_backends(tmp_path, monkeypatch, loader, dumper):
+    """The output must not depend on LibYAML being available"""
+    if loader is None:
+        pytest.skip("LibYAML is not available")
+    os.chdir(tmp_path)
+    monkeypatch.setattr(file_io, "YAMLLoader", loader)
+    monkeypatch.setattr(file_io, "YAMLDumper", dumper)
+    file = pathlib.Path("params.yaml")
+    for data in [
+        {"Node": {"a": [1, 2.5, None, True], "b": "text " * 100, "c": {"d": "e"}}},
+        {"Node": {"a": "ä " * 100, "b": "c\td " * 100, "e": "f\ng " * 100}},
+        {"Node": {"": "empty key", "a" * 125: "long key"}},
+    ]:
+        file_io.write_file(file, data)
+        assert file.read_text() == yaml.safe_dump(data, indent=4)
+        assert file_io.read_file(file) == data
+
+
+@pytest.mark.parametrize("fsync", (True, False))
+def test_atomic_open(tmp_path, monkeypatch, fsync):
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "atomic_writes", True)
+    monkeypatch.setattr(config, "fsync", fsync)
+    file = pathlib.Path("params.yaml")
+    file_io.write_file(file, {"a": "b"})
+    assert file_io.read_file(file) == {"a": "b"}
+    # permissions match a file created with 'open'
+    pathlib.Path("reference.txt").write_text("")
+    assert file.stat().st_mode == pathlib.Path("reference.txt").stat().st_mode
+
+    with pytest.raises(ValueError):
+        with file_io.atomic_open(file) as handle:
+            handle.write("a: c")
+            raise ValueError
+    # the original file is unchanged and no temporary files are left
+    assert file_io.read_file(file) == {"a": "b"}
+    assert sorted(x.name for x in tmp_path.iterdir()) == ["params.yaml", "reference.txt"]
+
+
+@pytest.mark.parametrize("fsync", (None, True, False))
+def test_atomic_open_fsync(tmp_path, monkeypatch, fsync):
+    monkeypatch.setattr(config, "atomic_writes", True)
+    calls = []
+    monkeypatch.setattr(os, "fsync", calls.append)
+    file_io.write_file(tmp_path / "metrics.json", {"a": 1}, fsync=fsync)
+    # the file and the directory are flushed, 'config.fsync' is used for None
+    assert len(calls) == (0 if fsync is False else 2)
+
+
+def test_write_file_atomic(tmp_path, monkeypatch):
+    """Test that the file is replaced and not written in place"""
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "atomic_writes", True)
+    file = pathlib.Path("zntrack.json")
+    file_io.write_file(file, {"a": "b"})
+    inode = file.stat().st_ino
+    with patch.object(pathlib.Path, "open", side_effect=AssertionError):
+        file_io.write_file(file, {"a": "c"})
+    assert file.stat().st_ino != inode
+    assert file_io.read_file(file) == {"a": "c"}
+
+
+def _update_config_many_times(node_name):
+    for idx in range(20):
+        file_io.update_config_file(
+            pathlib.Path("zntrack.json"), node_name=node_name, value_name="idx", value=idx
+        )
+        file_io.update_config_file(
+            pathlib.Path("zntrack.json"), node_name=node_name, value_name=idx, value=idx
+        )
+
+
+@pytest.mark.skipif(file_io.fcntl is None, reason="requires fcntl")
+def test_file_lock_processes(tmp_path, monkeypatch):
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "atomic_writes", True)
+    node_names = [f"Node{idx}" for idx in range(4)]
+    with multiprocessing.get_context("fork").Pool(len(node_names)) as pool:
+        pool.map(_update_config_many_times, node_names)
+
+    # no update was lost
+    file_content = file_io.read_file(pathlib.Path("zntrack.json"))
+    for node_name in node_names:
+        assert file_content[node_name] == {"idx": 19, **{str(x): x for x in range(20)}}
+
+
+def test_file_lock_reentrant(tmp_path):
+    os.chdir(tmp_path)
+    file = pathlib.Path("params.yaml")
+    with file_io.file_lock(file):
+        with file_io.file_lock(file):
+            file_io.update_config_file(file, node_name="Node", value_name="a", value=1)
+    assert file_io.read_file(file) == {"Node": {"a": 1}}
+
+
+@pytest.mark.skipif(file_io.fcntl is None, reason="requires fcntl")
+def test_file_lock_timeout(tmp_path, monkeypatch):
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "lock_timeout", 0.05)
+    file_io.lock_statistics.reset()
+    file = pathlib.Path("params.yaml")
+    # a new file descriptor behaves like another process
+    other_process = file_io._FileLock(os.path.realpath(file))
+    other_process.acquire(timeout=0)
+    try:
+        with pytest.raises(utils.exceptions.FileLockTimeoutError):
+            file_io.update_config_file(file, node_name="Node", value_name="a", value=1)
+    finally:
+        other_process.release()
+    assert file_io.lock_statistics.timeouts == 1
+    assert not file.exists()
+
+    file_io.update_config_file(file, node_name="Node", value_name="a", value=1)
+    assert file_io.lock_statistics.acquired == 1
+
+
+@pytest.mark.skipif(file_io.fcntl is None, reason="requires fcntl")
+def test_file_lock_project(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "lock_timeout", 0.05)
+    project = tmp_path / "project"
+    (project / ".dvc").mkdir(parents=True)
+    # another mount point of the same project
+    (tmp_path / "mount").symlink_to(project)
+
+    os.chdir(tmp_path / "mount")
+    other_process = file_io._FileLock("params.yaml")
+    assert other_process.lock_file.parent == project / ".dvc" / "tmp" / "zntrack-locks"
+
+    os.chdir(project)
+    assert file_io._FileLock("params.yaml").lock_file == other_process.lock_file
+    other_process.acquire(timeout=0)
+    try:
+        with pytest.raises(utils.exceptions.FileLockTimeoutError):
+            file_io.update_config_file(
+                pathlib.Path("params.yaml"), node_name="Node", value_name="a", value=1
+            )
+    finally:
+        other_process.release()
+
+
+def _lock_and_read(file):
+    with file_io.file_lock(file):
+        return file_io.read_file(file)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_file_lock_fork(tmp_path):
+    os.chdir(tmp_path)
+    file = pathlib.Path("params.yaml")
+    file_io.update_config_file(file, node_name="Node", value_name="a", value=1)
+    file_io.update_config_file(
+        pathlib.Path("zntrack.json"), node_name="Node", value_name="b", value=2
+    )
+    # locks held by other threads while forking, e.g. Nodes running in a thread pool
+    with file_io.file_lock(file), file_io._FILE_LOCKS_GUARD, file_io.file_cache._lock:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(1) as pool:
+            result = pool.apply_async(_lock_and_read, (tmp_path / "zntrack.json",))
+            assert result.get(timeout=10) == {"Node": {"b": 2}}
+
+
+def test_file_lock_without_fcntl(tmp_path, monkeypatch):
+    os.chdir(tmp_path)
+    # e.g. on Windows
+    monkeypatch.setattr(file_io, "fcntl", None)
+    monkeypatch.delattr(os, "getuid", raising=False)
+    file_io.update_config_file(
+        pathlib.Path("params.yaml"), node_name="Node", value_name="a", value=1
+    )
+    assert file_io.read_file(pathlib.Path("params.yaml")) == {"Node": {"a": 1}}
+
+
+def test_file_lock_statistics(tmp_path):
+    os.chdir(tmp_path)
+    file_io.lock_statistics.reset()
+    file = pathlib.Path("params.yaml")
+    locked = threading.Event()
+
+    def hold_lock():
+        with file_io.file_lock(file):
+            locked.set()
+            time.sleep(0.1)
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    locked.wait()
+    with file_io.file_lock(file):
+        pass
+    thread.join()
+
+    assert file_io.lock_statistics.acquired == 2
+    assert file_io.lock_statistics.contended == 1
+    assert file_io.lock_statistics.max_wait_time > 0.05
+
+
+def test_file_lock_disabled(tmp_path, monkeypatch):
+    os.chdir(tmp_path)
+    monkeypatch.setattr(config, "file_locking", False)
+    file_io.lock_statistics.reset()
+    file_io.update_config_file(
+        pathlib.Path("params.yaml"), node_name="Node", value_name="a", value=1
+    )
+    assert file_io.lock_statistics.acquired == 0
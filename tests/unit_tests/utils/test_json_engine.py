@@ -0,0 +1,98 @@
+import enum
+import json
+import math
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+import znjson
+
+from zntrack.utils import config, decode_dict, encode_dict, file_io, json_engine
+
+
+@pytest.fixture(params=json_engine.ENGINES)
+def engine(request, monkeypatch):
+    pytest.importorskip(request.param)
+    monkeypatch.setattr(config, "json_engine", request.param)
+    return request.param
+
+
+def test_write_read_file(tmp_path, engine):
+    os.chdir(tmp_path)
+    file = pathlib.Path("outs.json")
+    data = {"a": [1, 2.5, None, True], "b": {"c": "ä"}, "path": pathlib.Path("x.txt")}
+    file_io.write_file(file, data)
+
+    expected = {
+        "a": [1, 2.5, None, True],
+        "b": {"c": "ä"},
+        "path": {"_type": "pathlib.Path", "value": "x.txt"},
+    }
+    # readable by the standard library
+    assert json.loads(file.read_text(encoding="utf-8")) == expected
+    assert file_io.read_file(file) == expected
+
+
+def test_encode_decode_dict(engine):
+    value = {"path": pathlib.Path("x.txt"), "paths": [pathlib.Path("y.txt")]}
+    encoded = encode_dict(value)
+    assert encoded == {
+        "path": {"_type": "pathlib.Path", "value": "x.txt"},
+        "paths": [{"_type": "pathlib.Path", "value": "y.txt"}],
+    }
+    assert decode_dict(encoded) == value
+
+
+def test_fallback(engine):
+    assert json_engine.loads(json_engine.dumps({"a": 2**70})) == {"a": 2**70}
+    assert json_engine.loads("NaN") != json_engine.loads("NaN")
+
+
+@pytest.mark.parametrize("indent", (4, None))
+def test_non_finite_floats(engine, indent):
+    text = json_engine.dumps({"loss": math.nan, "bounds": [math.inf, -math.inf]}, indent)
+    data = json_engine.loads(text)
+    assert math.isnan(data["loss"])
+    assert data["bounds"] == [math.inf, -math.inf]
+
+
+class Color(enum.Enum):
+    RED = 1
+
+
+def test_enum(engine):
+    # all engines pass enums to the znjson converters
+    expected = json.loads(json.dumps({"a": [Color.RED]}, cls=znjson.ZnEncoder))
+    assert json_engine.loads(json_engine.dumps({"a": [Color.RED]})) == expected
+
+
+def test_not_serializable(engine):
+    with pytest.raises(TypeError):
+        json_engine.dumps({"a": object()})
+
+
+def test_unknown_engine(monkeypatch):
+    monkeypatch.setattr(config, "json_engine", "simplejson")
+    with pytest.raises(ValueError):
+        json_engine.dumps({})
+
+
+@pytest.mark.parametrize("config_index", (True, False))
+def test_write_read_file_ascii_locale(tmp_path, engine, config_index):
+    """Files are written as UTF-8 independent of the locale encoding"""
+    # the script itself must be ascii, the locale can not decode other characters
+    script = (
+        "import pathlib; from zntrack.utils import config, file_io;"
+        f" config.json_engine = '{engine}'; config.config_index = {config_index};"
+        " file, data = pathlib.Path('zntrack.json'), {'a': '\\u00e4\\u20ac'};"
+        " file_io.write_file(file, {'Node': data}, index=config.config_index);"
+        " assert file_io.read_file(file) == {'Node': data};"
+        " assert file_io.read_file_entry(file, 'Node') == data"
+    )
+    env = {**os.environ, "LC_ALL": "C", "PYTHONCOERCECLOCALE": "0", "PYTHONUTF8": "0"}
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, check=True)
+    assert json.loads((tmp_path / "zntrack.json").read_text(encoding="utf-8")) == {
+        "Node": {"a": "ä€"}
+    }
@@ -2,8 +2,11 @@ import json
 import os
 import pathlib
 import sys
+import threading
 from unittest.mock import MagicMock, patch
 
+import numpy as np
+import pytest
 import znjson
 
 from zntrack.utils import utils
@@ -26,6 +29,79 @@ def test_decode_dict_path():
     assert utils.decode_dict(None) is None
 
 
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"path": pathlib.Path("test.txt"), "arr": np.arange(5), "lst": (1, 2.5, None)},
+        {1: "int", 1.5: "float", float("inf"): "inf"},
+        {True: "bool", False: "false", None: "none"},
+        [{"nested": [pathlib.Path("a"), {"b": pathlib.Path("b")}]}],
+        "text",
+    ],
+)
+def test_encode_decode_dict(value):
+    """The tree-walking codec must be identical to a json round trip"""
+    encoded = json.loads(json.dumps(value, cls=znjson.ZnEncoder))
+    assert utils.encode_dict(value) == encoded
+    assert json.dumps(utils.decode_dict(value), cls=znjson.ZnEncoder) == json.dumps(
+        json.loads(json.dumps(value, cls=znjson.ZnEncoder), cls=znjson.ZnDecoder),
+        cls=znjson.ZnEncoder,
+    )
+
+
+def test_encode_dict_copy():
+    value = {"a": [1, 2], "b": {"c": 3}}
+    encoded = utils.encode_dict(value)
+    assert encoded == value
+    assert encoded["a"] is not value["a"]
+    assert encoded["b"] is not value["b"]
+
+
+def test_encode_dict_errors():
+    circular = []
+    circular.append(circular)
+    with pytest.raises(ValueError, match="Circular reference"):
+        utils.encode_dict({"a": circular})
+    with pytest.raises(TypeError):
+        utils.encode_dict({(1, 2): "tuple keys are not supported"})
+    with pytest.raises(TypeError):
+        utils.encode_dict(object())
+    with pytest.raises(TypeError):
+        utils.decode_dict({"_type": "does_not_exist", "value": None})
+
+
+class ComplexConverter(znjson.ConverterBase):
+    level = 1000
+    representation = "complex"
+    instance = complex
+
+    def encode(self, obj):
+        return [obj.real, obj.imag]
+
+    def decode(self, value):
+        return complex(*value)
+
+
+def test_thread_converters():
+    def encode_in_thread():
+        with pytest.raises(TypeError):
+            utils.encode_dict({"a": 1j})
+        results.append(True)
+
+    results = []
+    with utils.thread_converters([ComplexConverter]):
+        encoded = utils.encode_dict({"a": 1j})
+        assert encoded == {"a": {"_type": "complex", "value": [0.0, 1.0]}}
+        assert utils.decode_dict(encoded) == {"a": 1j}
+        thread = threading.Thread(target=encode_in_thread)
+        thread.start()
+        thread.join()
+    # the converter is neither used in other threads nor after the context
+    assert results == [True]
+    with pytest.raises(TypeError):
+        utils.encode_dict({"a": 1j})
+
+
 class EmptyCls:
     pass
 
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from zntrack.zn.arrays import ChunkedArray
+
+
+def test_chunked_array(tmp_path):
+    directory = tmp_path / "data.arrays"
+    array = ChunkedArray(directory, chunk_size=4)
+    for idx in range(5):
+        array.append([idx, -idx])
+    # only full chunks are written before flushing
+    assert [x.name for x in directory.iterdir()] == ["chunk_0.npy"]
+    array.extend(np.ones((6, 2), dtype=int))
+    array.flush()
+    assert sorted(x.name for x in directory.iterdir()) == [
+        "chunk_0.npy",
+        "chunk_1.npy",
+        "chunk_2.npy",
+        "manifest.json",
+    ]
+
+    expected = np.concatenate([[[x, -x] for x in range(5)], np.ones((6, 2))])
+    loaded = ChunkedArray.open(directory)
+    assert loaded.shape == (11, 2)
+    assert loaded.dtype == int
+    np.testing.assert_array_equal(loaded.to_numpy(), expected)
+    np.testing.assert_array_equal(np.asarray(loaded), expected)
+    np.testing.assert_array_equal(loaded[3:9], expected[3:9])
+    np.testing.assert_array_equal(loaded[::-3], expected[::-3])
+    np.testing.assert_array_equal(loaded[2:6, 1], expected[2:6, 1])
+    np.testing.assert_array_equal(loaded[-1], expected[-1])
+    assert loaded[4, 1] == -4
+    assert loaded[20:].shape == (0, 2)
+    assert [len(x) for x in loaded.iter_chunks()] == [4, 4, 3]
+    with pytest.raises(IndexError):
+        loaded[11]
+    with pytest.raises(ValueError):
+        loaded.append([1, 2])
+
+
+def test_chunked_array_errors(tmp_path):
+    array = ChunkedArray(tmp_path, chunk_size=4)
+    array.append([1, 2])
+    with pytest.raises(ValueError):
+        array.append([1, 2, 3])
+    with pytest.raises(ValueError):
+        array.append([1.5, 2.5])
+    with pytest.raises(TypeError):
+        ChunkedArray(tmp_path, chunk_size=4).append([{"a": 1}])
+
+
+def test_chunked_array_replace(tmp_path):
+    array = ChunkedArray(tmp_path, chunk_size=2)
+    array.extend(np.arange(10))
+    array.flush()
+
+    array = ChunkedArray(tmp_path, chunk_size=2)
+    array.extend(np.arange(3))
+    array.flush()
+    assert len(list(tmp_path.glob("chunk_*.npy"))) == 2
+    np.testing.assert_array_equal(ChunkedArray.open(tmp_path), np.arange(3))
+
+    ChunkedArray(tmp_path, chunk_size=2).flush()
+    assert ChunkedArray.open(tmp_path).shape == (0,)
+    assert list(tmp_path.glob("chunk_*.npy")) == []
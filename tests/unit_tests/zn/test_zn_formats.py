@@ -0,0 +1,163 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from zntrack import config
+from zntrack.zn import formats
+
+
+def test_get_format():
+    assert isinstance(formats.get_format("npy"), formats.NumpyFormat)
+    assert isinstance(formats.get_format("npz"), formats.NumpyArchiveFormat)
+    assert isinstance(formats.get_format("pickle"), formats.PickleFormat)
+    assert isinstance(formats.get_format("lazy"), formats.LazyFormat)
+    assert isinstance(formats.get_format("auto"), formats.AutoFormat)
+    with pytest.raises(ValueError):
+        formats.get_format("json")
+
+
+def test_npy_format(tmp_path):
+    file = tmp_path / "outs.npy"
+    data = np.arange(100, dtype=float).reshape(10, 10)
+    formats.NumpyFormat().save(file, data)
+
+    value = formats.NumpyFormat().load(file)
+    assert isinstance(value, np.memmap)
+    assert not value.flags.writeable
+    np.testing.assert_array_equal(value, data)
+    np.testing.assert_array_equal(value[2:4, 5], data[2:4, 5])
+
+    with pytest.raises(TypeError):
+        formats.NumpyFormat().save(file, [1, 2, 3])
+    with pytest.raises(TypeError):
+        formats.NumpyFormat().save(file, np.array([{"a": 1}]))
+
+
+def test_npz_format(tmp_path):
+    file = tmp_path / "outs.npz"
+    data = {"a": np.arange(5), "b": np.ones((2, 2))}
+    formats.NumpyArchiveFormat().save(file, data)
+
+    value = formats.NumpyArchiveFormat().load(file)
+    assert value.keys() == data.keys()
+    for key, array in data.items():
+        np.testing.assert_array_equal(value[key], array)
+
+    with pytest.raises(TypeError):
+        formats.NumpyArchiveFormat().save(file, np.arange(5))
+
+
+def test_pickle_format(tmp_path):
+    file = tmp_path / "outs.pickle"
+    data = {"large": np.arange(10_000, dtype=float), "small": np.arange(3), "a": [1]}
+    formats.PickleFormat().save(file, data)
+    assert sorted(x.name for x in file.iterdir()) == ["buffer_0.bin", "data.pkl"]
+    assert (file / "buffer_0.bin").stat().st_size == data["large"].nbytes
+
+    value = formats.PickleFormat().load(file)
+    assert value.keys() == data.keys()
+    assert not value["large"].flags.writeable
+    np.testing.assert_array_equal(value["large"], data["large"])
+    np.testing.assert_array_equal(value["small"], data["small"])
+    assert value["a"] == [1]
+
+    # outdated buffers are removed
+    formats.PickleFormat().save(file, [1, 2, 3])
+    assert [x.name for x in file.iterdir()] == ["data.pkl"]
+    assert formats.PickleFormat().load(file) == [1, 2, 3]
+
+
+def test_lazy_format_dict(tmp_path):
+    file = tmp_path / "outs.lazy"
+    data = {"energy": np.arange(5), "forces": [[1, 2]], "name": "a"}
+    formats.LazyFormat().save(file, data)
+
+    value = formats.LazyFormat().load(file)
+    assert isinstance(value, formats.LazyDict)
+    assert list(value) == ["energy", "forces", "name"]
+    # only the accessed entry is read
+    (file / "1.json").unlink()
+    np.testing.assert_array_equal(value["energy"], data["energy"])
+    assert value["name"] == "a"
+    with pytest.raises(KeyError):
+        value["stress"]
+
+    with pytest.raises(TypeError):
+        formats.LazyFormat().save(file, {1: "a"})
+    with pytest.raises(TypeError):
+        formats.LazyFormat().save(file, "a")
+
+
+def test_lazy_format_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(formats.LazyFormat, "chunk_size", 10)
+    file = tmp_path / "outs.lazy"
+    formats.LazyFormat().save(file, list(range(25)))
+    assert len(list(file.glob("*.json"))) == 4
+
+    value = formats.LazyFormat().load(file)
+    assert isinstance(value, formats.LazyList)
+    assert len(value) == 25
+    (file / "0.json").unlink()
+    assert value[12] == 12
+    assert value[-1] == 24
+    assert value[15:22:3] == [15, 18, 21]
+    with pytest.raises(IndexError):
+        value[25]
+
+    # outdated chunks are removed
+    formats.LazyFormat().save(file, list(range(5)))
+    assert formats.LazyFormat().load(file) == list(range(5))
+    assert len(list(file.glob("*.json"))) == 2
+
+
+def test_parquet_format(tmp_path):
+    pytest.importorskip("pyarrow")
+    file = tmp_path / "outs.parquet"
+    data = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}, index=pd.Index([3, 4], name="i"))
+    formats.ParquetFormat().save(file, data)
+    pd.testing.assert_frame_equal(formats.ParquetFormat().load(file), data)
+
+    with pytest.raises(TypeError):
+        formats.ParquetFormat().save(file, {"a": [1, 2]})
+
+
+@pytest.mark.parametrize(
+    ("value", "name"),
+    [
+        (np.arange(1000, dtype=float), "npy"),
+        (np.arange(10, dtype=float), "json"),
+        ({"a": np.ones(500), "b": np.ones(500)}, "npz"),
+        ({"a": np.ones(500), "b": [1] * 500}, "json"),
+        (list(range(1000)), "json"),
+    ],
+)
+def test_auto_format(tmp_path, monkeypatch, value, name):
+    monkeypatch.setattr(config, "auto_format_threshold", 1000)
+    file = tmp_path / "outs.auto"
+    formats.AutoFormat().save(file, value)
+    assert json.loads((file / "format.json").read_text()) == {"format": name}
+    assert sorted(x.name for x in file.iterdir()) == [f"data.{name}", "format.json"]
+
+    loaded = formats.AutoFormat().load(file)
+    if isinstance(value, dict):
+        assert loaded.keys() == value.keys()
+        for key in value:
+            np.testing.assert_array_equal(loaded[key], value[key])
+    else:
+        np.testing.assert_array_equal(loaded, value)
+
+
+def test_auto_format_dataframe(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(config, "auto_format_threshold", 1000)
+    file = tmp_path / "outs.auto"
+    formats.AutoFormat().save(file, pd.DataFrame({"a": range(1000)}))
+    assert json.loads((file / "format.json").read_text()) == {"format": "parquet"}
+    assert formats.AutoFormat().load(file)["a"].tolist() == list(range(1000))
+
+    # the data file of the previous format is removed
+    formats.AutoFormat().save(file, {"small": 1})
+    assert sorted(x.name for x in file.iterdir()) == ["data.json", "format.json"]
+    assert formats.AutoFormat().load(file) == {"small": 1}
@@ -10,6 +10,8 @@ import znjson
 
 from zntrack import utils
 from zntrack.core.base import Node
+from zntrack.core.dvcgraph import write_graphs
+from zntrack.core.executor import run_nodes
 from zntrack.core.functions.decorator import NodeConfig, nodify
 from zntrack.interface.base import DVCInterface
 from zntrack.project.zntrack_project import ZnTrackProject
@@ -33,6 +35,8 @@ __all__ = [
     nodify.__name__,
     NodeConfig.__name__,
     "getdeps",
+    run_nodes.__name__,
+    write_graphs.__name__,
     "utils",
     "exceptions",
 ]
@@ -15,9 +15,12 @@ from zntrack import dvc, meta, utils, zn
 from zntrack.core.dvcgraph import (
     DVCRunOptions,
     ZnTrackInfo,
+    apply_post_dvc_cmd,
     filter_ZnTrackOption,
+    get_ignored_files,
     handle_dvc,
     prepare_dvc_script,
+    prepare_dvc_stage,
     run_post_dvc_cmd,
 )
 from zntrack.core.jupyter import jupyter_class_to_file
@@ -72,7 +75,7 @@ def handle_deps(value) -> typing.List[str]:
     return deps_files
 
 
-def _handle_nodes_as_methods(nodes: dict):
+def _handle_nodes_as_methods(nodes: dict, native: bool = False):
     """Write the graph for all zn.Nodes ZnTrackOptions
 
     zn.Nodes ZnTrackOptions will require a dedicated graph to be written.
@@ -84,12 +87,18 @@ def _handle_nodes_as_methods(nodes: dict):
     ----------
     nodes: dict
         A dictionary of {option_name: zntrack.Node}
+    native: bool, default = False
+        Write the stages directly to the 'dvc.yaml', see 'Node.write_graph'. They
+        are not run, because they might be part of a pending config transaction,
+        e.g. in 'zntrack.write_graphs'. Instead, 'dvc repro' of the main Node runs
+        them as its dependencies.
     """
     for node in nodes.values():
         if node is not None:
             node.write_graph(
-                run=True,
+                run=not native,
                 call_args=f".load(name='{node.node_name}').save(hash_only=True)",
+                native=native,
             )
 
 
@@ -155,10 +164,15 @@ class NodeBase(zninit.ZnInit):
         If the Node is not used directly but through e.g. zn.Nodes() as a dependency
         this can be set to True. It will disable all outputs in the params.yaml file
         except for the zn.Hash().
+    execution: str, default = "process"
+        How 'zntrack.run_nodes(parallel=True)' runs this Node. Either "process" to use
+        a process pool or "thread" to use a thread pool, e.g. for Nodes that mostly
+        wait for files or subprocesses and release the GIL.
     """
 
     is_loaded: bool = False
     node_name = None
+    execution: str = "process"
     _module = None
     _is_attribute = False
 
@@ -248,7 +262,42 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
             if option.zn_type is utils.ZnTypes.PLOTS:
                 option.save(instance=self)
 
-    def save(self, results: bool = False, hash_only: bool = False):
+    def update_metrics(self, attribute: str = None, **values):
+        """Update the zn.metrics during a run
+
+        The values are merged into the metrics and written to e.g.
+        'nodes/<node_name>/metrics_no_cache.json' immediately, so the progress of
+        a run can be monitored. Other outputs are not written, but every call
+        re-reads and re-serializes the whole metrics file, see 'zn.metrics.update'.
+        Therefore, it should be called e.g. once per epoch, not for every step.
+
+        Parameters
+        ----------
+        attribute: str, optional
+            The name of the zn.metrics attribute to update. Can be omitted
+            if the Node has only a single zn.metrics.
+        values:
+            The metrics to add or replace, e.g. 'self.update_metrics(loss=0.1)'.
+
+        Raises
+        ------
+        ValueError: if the zn.metrics attribute is not unique or does not exist
+        """
+        options = {
+            option.name: option
+            for option in self._descriptor_list
+            if isinstance(option, zn.metrics)
+        }
+        if attribute is None and len(options) == 1:
+            attribute = next(iter(options))
+        if attribute not in options:
+            raise ValueError(
+                f"Can not update the metrics '{attribute}' of {self}. Select one of"
+                f" {list(options)}."
+            )
+        options[attribute].update(instance=self, values=values)
+
+    def save(self, results: bool = False, hash_only: bool = False, batch: bool = True):
         """Save Class state to files
 
         Parameters
@@ -261,6 +310,11 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
 
         hash_only: bool, default = False
             Only save zn.Hash and nothing else. This is required for usage as zn.Nodes
+
+        batch: bool, default = True
+            Collect all updates in memory and write every configuration file, e.g.
+            params.yaml / zntrack.json, only once. If False, every ZnTrackOption
+            updates the files individually.
         """
         if hash_only:
             try:
@@ -271,25 +325,41 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
                 ) from err
             return
 
-        if not results:
-            # Reset everything in params.yaml and zntrack.json before saving
-            utils.file_io.clear_config_file(utils.Files.params, node_name=self.node_name)
-            utils.file_io.clear_config_file(utils.Files.zntrack, node_name=self.node_name)
-        # Save dvc.<option>, dvc.deps, zn.Method
+        transaction = (
+            utils.file_io.config_transaction() if batch else contextlib.nullcontext()
+        )
+        with transaction:
+            if not results:
+                # Reset everything in params.yaml and zntrack.json before saving
+                for file in [utils.Files.params, utils.Files.zntrack]:
+                    if utils.config.sharded_config and file.exists():
+                        # remove the entry from a previous run without sharding
+                        if self.node_name in utils.file_io.read_file(file):
+                            utils.file_io.clear_config_file(file, self.node_name)
+                    elif not utils.config.sharded_config:
+                        # remove a shard from a previous 'config.sharded_config' run
+                        pathlib.Path("nodes", self.node_name, file.name).unlink(
+                            missing_ok=True
+                        )
+                    utils.file_io.clear_config_file(
+                        utils.Files.get_node_file(file, self.node_name),
+                        node_name=self.node_name,
+                    )
+            # Save dvc.<option>, dvc.deps, zn.Method
 
-        for option in self._descriptor_list:
-            if results:
-                if option.zn_type in utils.VALUE_DVC_TRACKED:
-                    # only save results
-                    option.save(instance=self)
-            else:
-                if option.zn_type not in utils.VALUE_DVC_TRACKED + utils.GIT_TRACKED:
-                    # save all dvc.<options>
-                    option.save(instance=self)
+            for option in self._descriptor_list:
+                if results:
+                    if option.zn_type in utils.VALUE_DVC_TRACKED:
+                        # only save results
+                        option.save(instance=self)
                 else:
-                    # Create the path for DVC to write a .gitignore file
-                    # for the filtered files
-                    option.mkdir(instance=self)
+                    if option.zn_type not in utils.VALUE_DVC_TRACKED + utils.GIT_TRACKED:
+                        # save all dvc.<options>
+                        option.save(instance=self)
+                    else:
+                        # Create the path for DVC to write a .gitignore file
+                        # for the filtered files
+                        option.mkdir(instance=self)
 
     def _update_options(self, lazy=None):
         """Update all ZnTrack options inheriting from ZnTrackOption
@@ -376,6 +446,8 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
             # Save e.g. the parameters if the Node is not loaded
             #  this can happen, when using this method outside 'dvc repro'
             self.save()
+        for option in self._descriptor_list:
+            option.prepare_run(instance=self)
         self.run()
         self.save(results=True)
 
@@ -412,9 +484,8 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
         """list of all files that can be changed by this instance"""
         files = []
         for option in self._descriptor_list:
-            file = option.get_filename(self)
             if option.zn_type in utils.VALUE_DVC_TRACKED:
-                files.append(file)
+                files += [file for _, file in option.get_dvc_outputs(self)]
             elif option.zn_type in utils.FILE_DVC_TRACKED:
                 value = getattr(self, option.name)
                 if isinstance(value, (list, tuple)):
@@ -468,6 +539,7 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
         write_desc: bool = True,
         *,
         call_args: str = None,
+        native: bool = None,
     ):
         """Write the DVC file using run.
 
@@ -496,6 +568,9 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
             Save the Node.__doc__ to the 'dvc.yaml' Node description.
         call_args: str, default = None
             Custom call args. Defaults to '.load(name='{self.node_name}').run_and_save()'
+        native: bool, default = None
+            Write the stage directly to the 'dvc.yaml' instead of calling
+            'dvc stage add' in a subprocess. Defaults to 'config.native_stages'.
 
         Notes
         -----
@@ -504,7 +579,10 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
 
         """
 
-        _handle_nodes_as_methods(self.zntrack.collect(zn_nodes))
+        if native is None:
+            native = utils.config.native_stages
+
+        _handle_nodes_as_methods(self.zntrack.collect(zn_nodes), native=native)
 
         if silent:
             log.warning(
@@ -536,10 +614,8 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
             data=self._descriptor_list, cls=self, zn_type=[utils.ZnTypes.PARAMS]
         )
         if len(params_list) > 0:
-            custom_args += [
-                "--params",
-                f"{utils.Files.params}:{self.node_name}",
-            ]
+            params_file = utils.Files.get_node_file(utils.Files.params, self.node_name)
+            custom_args += ["--params", f"{params_file.as_posix()}:{self.node_name}"]
         zn_options_set = set()
         for option in self._descriptor_list:
             if option.zn_type == utils.ZnTypes.DVC:
@@ -547,12 +623,8 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
                 custom_args += handle_dvc(value, option.dvc_args)
             # Handle Zn Options
             elif option.zn_type in utils.VALUE_DVC_TRACKED:
-                zn_options_set.add(
-                    (
-                        f"--{option.dvc_args}",
-                        option.get_filename(self).as_posix(),
-                    )
-                )
+                for dvc_args, file in option.get_dvc_outputs(self):
+                    zn_options_set.add((f"--{dvc_args}", file.as_posix()))
             elif option.zn_type == utils.ZnTypes.DEPS:
                 value = getattr(self, option.name)
                 dependencies += handle_deps(value)
@@ -566,15 +638,16 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
         if call_args is None:
             call_args = f".load(name='{self.node_name}').run_and_save()"
 
-        script = prepare_dvc_script(
-            node_name=self.node_name,
-            dvc_run_option=dvc_run_option,
-            custom_args=custom_args,
-            nb_name=nb_name,
-            module=self.module,
-            func_or_cls=self.__class__.__name__,
-            call_args=call_args,
-        )
+        stage_kwargs = {
+            "node_name": self.node_name,
+            "dvc_run_option": dvc_run_option,
+            "custom_args": custom_args,
+            "nb_name": nb_name,
+            "module": self.module,
+            "func_or_cls": self.__class__.__name__,
+            "call_args": call_args,
+        }
+        script = prepare_dvc_script(**stage_kwargs)
 
         # Add command to run the script
 
@@ -587,18 +660,34 @@ class Node(NodeBase, metaclass=LoadViaGetItem):
 
         if dry_run:
             return script
-        utils.run_dvc_cmd(script)
 
-        run_post_dvc_cmd(descriptor_list=self._descriptor_list, instance=self)
+        utils.content_store.save_store()
 
-        for option in self._descriptor_list:
-            if option.zn_type in utils.GIT_TRACKED:
-                option.save(instance=self)
+        transaction = (
+            utils.file_io.config_transaction() if native else contextlib.nullcontext()
+        )
+        with transaction:
+            if native:
+                stage = prepare_dvc_stage(**stage_kwargs)
+                for option in self._descriptor_list:
+                    if option.post_dvc_cmd(self) is not None:
+                        apply_post_dvc_cmd(stage, option.post_dvc_cmd(self))
+                utils.file_io.update_stage(
+                    utils.Files.dvc, node_name=self.node_name, stage=stage, force=force
+                )
+                utils.file_io.update_gitignore(get_ignored_files(stage))
+            else:
+                utils.run_dvc_cmd(script)
+                run_post_dvc_cmd(descriptor_list=self._descriptor_list, instance=self)
 
-        if write_desc:
-            utils.file_io.update_desc(
-                file=utils.Files.dvc, node_name=self.node_name, desc=self.__doc__
-            )
+            for option in self._descriptor_list:
+                if option.zn_type in utils.GIT_TRACKED:
+                    option.save(instance=self)
+
+            if write_desc:
+                utils.file_io.update_desc(
+                    file=utils.Files.dvc, node_name=self.node_name, desc=self.__doc__
+                )
 
         if not no_exec:
             utils.run_dvc_cmd(["dvc", "repro", self.node_name])
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import collections
 import dataclasses
 import logging
 import pathlib
@@ -171,13 +172,167 @@ def prepare_dvc_script(
     if nb_name is not None:
         script += ["--deps", utils.module_to_path(module).as_posix()]
 
-    import_str = f"""{utils.get_python_interpreter()} -c "from {module} import """
-    import_str += f"""{func_or_cls}; {func_or_cls}{call_args}" """
-    script += [import_str]
+    script += [_get_cmd(module=module, func_or_cls=func_or_cls, call_args=call_args)]
     log.debug(f"dvc script: {' '.join([str(x) for x in script])}")
     return script
 
 
+def _get_cmd(module, func_or_cls, call_args) -> str:
+    """Get the cmd of the stage that imports and runs the Node"""
+    import_str = f"""{utils.get_python_interpreter()} -c "from {module} import """
+    import_str += f"""{func_or_cls}; {func_or_cls}{call_args}" """
+    return import_str
+
+
+# {dvc stage add option: (dvc.yaml key, flags of the output)}
+_DVC_OUTPUTS = {
+    "--outs": ("outs", {}),
+    "--outs-no-cache": ("outs", {"cache": False}),
+    "--outs-persist": ("outs", {"persist": True}),
+    "--outs-persistent": ("outs", {"persist": True}),
+    "--outs-persist-no-cache": ("outs", {"cache": False, "persist": True}),
+    "--checkpoints": ("outs", {"checkpoint": True}),
+    "--metrics": ("metrics", {}),
+    "--metrics-no-cache": ("metrics", {"cache": False}),
+    "--plots": ("plots", {}),
+    "--plots-no-cache": ("plots", {"cache": False}),
+}
+# {dvc plots modify option: dvc.yaml key} in the order DVC writes them
+_DVC_PLOTS_PROPS = {
+    "--template": "template",
+    "-x": "x",
+    "-y": "y",
+    "--x-label": "x_label",
+    "--y-label": "y_label",
+    "--title": "title",
+    "--no-header": "header",
+}
+
+
+def prepare_dvc_stage(
+    node_name,
+    dvc_run_option: DVCRunOptions,
+    custom_args: list,
+    nb_name,
+    module,
+    func_or_cls,
+    call_args,
+) -> dict:
+    """Prepare the 'dvc.yaml' stage that 'dvc stage add' would write
+
+    Takes the same arguments as 'prepare_dvc_script'. The deps, params and outputs
+    are sorted the same way DVC does, so that the stage is identical to the one
+    written by the subprocess call.
+
+    Returns
+    -------
+    dict:
+        The stage, e.g. {"cmd": ..., "deps": [...], "params": [...], "outs": [...]}
+    """
+    deps = set()
+    params = collections.defaultdict(set)
+    outputs = {}
+    if nb_name is not None:
+        deps.add(utils.module_to_path(module).as_posix())
+    for option, value in zip(custom_args[::2], custom_args[1::2]):
+        if option == "--deps":
+            deps.add(value)
+        elif option == "--params":
+            path, _, keys = value.rpartition(":")
+            params[path or utils.Files.params.as_posix()].update(
+                key for key in keys.split(",") if key
+            )
+        elif option in _DVC_OUTPUTS:
+            outputs[value] = _DVC_OUTPUTS[option]
+        else:
+            raise ValueError(f"Unsupported option '{option}' for the stage {node_name}")
+
+    stage = {"cmd": _get_cmd(module=module, func_or_cls=func_or_cls, call_args=call_args)}
+    if deps:
+        stage["deps"] = sorted(deps)
+    if params:
+        # keys of the default params file come first, followed by the other files
+        stage["params"] = []
+        for path in sorted(params):
+            keys = sorted(params[path])
+            if keys and path == utils.Files.params.as_posix():
+                stage["params"] = keys + stage["params"]
+            else:
+                stage["params"].append({path: keys or None})
+    for key in ("outs", "metrics", "plots"):
+        entries = [
+            {path: dict(flags)} if flags else path
+            for path, (output_key, flags) in sorted(outputs.items())
+            if output_key == key
+        ]
+        if entries:
+            stage[key] = entries
+    if dvc_run_option.always_changed:
+        stage["always_changed"] = True
+    return stage
+
+
+def apply_post_dvc_cmd(stage: dict, script: list):
+    """Apply a 'dvc plots modify' script, see 'post_dvc_cmd', to the stage"""
+    if script[:3] != ["dvc", "plots", "modify"]:
+        raise ValueError(f"Can not apply '{' '.join(script)}' to the stage.")
+    file, args = script[3], script[4:]
+    props = {}
+    for option, key in _DVC_PLOTS_PROPS.items():
+        if option == "--no-header":
+            if option in args:
+                props[key] = False
+        elif option in args:
+            props[key] = args[args.index(option) + 1]
+    for idx, entry in enumerate(stage.get("plots", [])):
+        path, flags = (
+            next(iter(entry.items())) if isinstance(entry, dict) else (entry, {})
+        )
+        if path == file:
+            stage["plots"][idx] = {path: {**flags, **props}}
+            return
+    raise ValueError(f"Could not find the plots output '{file}' in {stage}")
+
+
+def get_ignored_files(stage: dict) -> typing.List[pathlib.Path]:
+    """Get the cached outputs of the stage, which DVC adds to the '.gitignore'"""
+    files = []
+    for key in ("outs", "metrics", "plots"):
+        for entry in stage.get(key, []):
+            path, flags = (
+                next(iter(entry.items())) if isinstance(entry, dict) else (entry, {})
+            )
+            if flags.get("cache", True):
+                files.append(pathlib.Path(path))
+    return files
+
+
+def write_graphs(nodes: list, no_exec: bool = True, run: bool = None, **kwargs):
+    """Write the DVC stages of many Nodes at once
+
+    Instead of calling 'dvc stage add' for every Node, the stages are written
+    directly, see 'prepare_dvc_stage'. The params.yaml, zntrack.json and dvc.yaml
+    are only written once for all Nodes.
+
+    Parameters
+    ----------
+    nodes: list[Node]
+        The Nodes to write the stages for.
+    no_exec: bool, default = True
+        Do not run the Nodes. Otherwise, 'dvc repro' is run once for all Nodes.
+    run: bool, inverse of no_exec. Will overwrite no_exec if set.
+    kwargs:
+        Additional arguments for 'Node.write_graph', e.g. 'always_changed'.
+    """
+    if run is not None:
+        no_exec = not run
+    with utils.file_io.config_transaction():
+        for node in nodes:
+            node.write_graph(native=True, **kwargs)
+    if not no_exec and nodes:
+        utils.run_dvc_cmd(["dvc", "repro", *(node.node_name for node in nodes)])
+
+
 class ZnTrackInfo:
     """Helping class for access to ZnTrack information"""
 
@@ -0,0 +1,192 @@
+"""Description: Run Nodes in the current python interpreter
+
+'dvc repro' starts a new interpreter for every stage. For fast iterations, the
+Nodes can instead be executed in-process with 'run_nodes'. The dependency graph is
+built from the zn.deps / dvc.deps / zn.Nodes of the Nodes, which are the same
+dependencies that 'Node.write_graph' passes to DVC. Afterwards, a single
+'dvc commit' records the results in 'dvc.lock', so that 'dvc repro' considers
+the stages up to date.
+
+With 'parallel=True', every Node whose dependencies are finished is dispatched to
+a 'concurrent.futures.ProcessPoolExecutor', so independent Nodes run on multiple
+cores. Nodes with 'execution = "thread"' are dispatched to a thread pool instead,
+which avoids starting a process for Nodes that mostly wait for I/O. Files that are
+shared between Nodes, e.g. zntrack.json, are protected by the file locks of
+'zntrack.utils.file_io', which are replaced in the forked processes, because they
+might be held by a thread at the time of the fork. The state that ZnTrack modifies
+while running a Node, e.g. config transactions, is local to the thread.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import pathlib
+import typing
+
+from zntrack import utils
+from zntrack.core.base import Node, handle_deps
+
+log = logging.getLogger(__name__)
+
+
+def get_dependency_files(node: Node) -> typing.Set[pathlib.Path]:
+    """Get all files the given Node depends on, as passed to 'dvc stage add --deps'"""
+    files = []
+    for option in node._descriptor_list:  # pylint: disable=protected-access
+        if option.zn_type == utils.ZnTypes.DEPS:
+            files += handle_deps(getattr(node, option.name))
+    return {pathlib.Path(file) for file in files}
+
+
+def _is_produced_by(file: pathlib.Path, outputs: typing.Set[pathlib.Path]) -> bool:
+    """Check if the file is an output or inside / contains a directory output"""
+    return any(
+        file == output or output in file.parents or file in output.parents
+        for output in outputs
+    )
+
+
+def get_graph(nodes: typing.List[Node]) -> typing.Dict[str, typing.Set[str]]:
+    """Get the dependencies between the given Nodes
+
+    Dependencies on Nodes that are not in the list are ignored.
+
+    Returns
+    -------
+    dict:
+        {node_name: {node_names it depends on}}
+    """
+    outputs = {
+        node.node_name: {pathlib.Path(file) for file in node.affected_files}
+        for node in nodes
+    }
+    graph = {}
+    for node in nodes:
+        dependencies = get_dependency_files(node)
+        graph[node.node_name] = {
+            name
+            for name, files in outputs.items()
+            if name != node.node_name
+            and any(_is_produced_by(file, files) for file in dependencies)
+        }
+    return graph
+
+
+def topological_sort(graph: typing.Dict[str, typing.Set[str]]) -> typing.List[str]:
+    """Sort the Nodes, such that every Node comes after its dependencies
+
+    The order of independent Nodes is preserved.
+
+    Raises
+    ------
+    CyclicGraphError: if the dependencies contain a cycle
+    """
+    remaining = {name: set(dependencies) for name, dependencies in graph.items()}
+    order = []
+    while remaining:
+        ready = [name for name, dependencies in remaining.items() if not dependencies]
+        if not ready:
+            raise utils.exceptions.CyclicGraphError(
+                f"The dependencies of {list(remaining)} contain a cycle."
+            )
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for dependencies in remaining.values():
+            dependencies.difference_update(ready)
+    return order
+
+
+def run_node(cls: typing.Type[Node], node_name: str):
+    """Run a single Node the same way as the command of its 'dvc.yaml' stage"""
+    log.debug(f"Running {node_name} in-process")
+    cls.load(name=node_name).run_and_save()
+
+
+_EXECUTION_MODES = ("process", "thread")
+
+
+def _run_parallel(
+    nodes: typing.Dict[str, Node],
+    graph: typing.Dict[str, typing.Set[str]],
+    order: typing.List[str],
+    max_workers: int = None,
+):
+    """Run every Node in a pool as soon as its dependencies are finished
+
+    Depending on 'Node.execution', the Node is run in a process or a thread pool.
+    If a Node fails, no further Nodes are started and the error is raised once
+    the running Nodes are finished.
+    """
+    for name in order:
+        if nodes[name].execution not in _EXECUTION_MODES:
+            raise ValueError(
+                f"Unknown execution '{nodes[name].execution}' of {name}, use one of"
+                f" {_EXECUTION_MODES}"
+            )
+    remaining = {name: set(graph[name]) for name in order}
+    running = {}
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers
+    ) as process_pool, concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as thread_pool:
+        pools = {"process": process_pool, "thread": thread_pool}
+        while remaining or running:
+            for name in [name for name in order if remaining.get(name) == set()]:
+                pool = pools[nodes[name].execution]
+                running[pool.submit(run_node, type(nodes[name]), name)] = name
+                del remaining[name]
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    concurrent.futures.wait(running)
+                    raise future.exception()
+                log.debug(f"Finished {name}")
+                for dependencies in remaining.values():
+                    dependencies.discard(name)
+
+
+def run_nodes(
+    nodes: typing.List[Node],
+    commit: bool = True,
+    parallel: bool = False,
+    max_workers: int = None,
+):
+    """Run the Nodes in the order of their dependencies without 'dvc repro'
+
+    The graph of the Nodes must be written before, e.g. 'node.write_graph()'.
+
+    Parameters
+    ----------
+    nodes: list[Node]
+        The Nodes to run. Dependencies on other Nodes are assumed to be up to date.
+    commit: bool, default = True
+        Record the results in 'dvc.lock' via 'dvc commit', so that 'dvc repro'
+        does not run the Nodes again.
+    parallel: bool, default = False
+        Run independent Nodes in parallel in a process or thread pool, see
+        'Node.execution'. Otherwise, all Nodes are run one after another in the
+        current interpreter.
+    max_workers: int, default = None
+        The number of processes / threads per pool, if 'parallel' is set.
+        Defaults to the number of CPUs.
+
+    Raises
+    ------
+    CyclicGraphError: if the dependencies of the Nodes contain a cycle
+    ValueError: if 'Node.execution' is neither "process" nor "thread"
+    """
+    nodes = {node.node_name: node for node in nodes}
+    graph = get_graph(list(nodes.values()))
+    order = topological_sort(graph)
+    if parallel:
+        _run_parallel(nodes, graph=graph, order=order, max_workers=max_workers)
+    else:
+        for name in order:
+            run_node(type(nodes[name]), name)
+    if commit and order:
+        utils.run_dvc_cmd(["dvc", "commit", "--force", *order])
@@ -86,7 +86,8 @@ class NodeConfig:
         """
         script = []
         if self.params is not None and len(self.params) > 0:
-            script += ["--params", f"{utils.Files.params}:{node_name}"]
+            params_file = utils.Files.get_node_file(utils.Files.params, node_name)
+            script += ["--params", f"{params_file.as_posix()}:{node_name}"]
         for datacls_field in dataclasses.fields(self):
             if datacls_field.name == "params":
                 continue
@@ -133,9 +134,11 @@ def execute_function_call(func):
     """
     # TODO should exec_func always load from file or check if values
     #  are passed and then update the files?
-    cfg_file_content = utils.file_io.read_file(utils.Files.zntrack)[func.__name__]
+    zntrack_file = utils.Files.get_node_file(utils.Files.zntrack, func.__name__)
+    params_file = utils.Files.get_node_file(utils.Files.params, func.__name__)
+    cfg_file_content = utils.file_io.read_file_entry(zntrack_file, func.__name__)
     cfg_file_content = utils.decode_dict(cfg_file_content)
-    params_file_content = utils.file_io.read_file(utils.Files.params)[func.__name__]
+    params_file_content = utils.file_io.read_file_entry(params_file, func.__name__)
     cfg_file_content["params"] = params_file_content
 
     loaded_cfg = NodeConfig(**cfg_file_content)
@@ -153,21 +156,22 @@ def save_node_config_to_files(cfg: NodeConfig, node_name: str):
     node_name: str
         The name of the node, usually func.__name__
     """
-    for value_name, value in dataclasses.asdict(cfg).items():
-        if value_name == "params":
-            utils.file_io.update_config_file(
-                file=utils.Files.params,
-                node_name=node_name,
-                value_name=None,
-                value=value,
-            )
-        else:
-            utils.file_io.update_config_file(
-                file=utils.Files.zntrack,
-                node_name=node_name,
-                value_name=value_name,
-                value=value,
-            )
+    with utils.file_io.config_transaction():
+        for value_name, value in dataclasses.asdict(cfg).items():
+            if value_name == "params":
+                utils.file_io.update_config_file(
+                    file=utils.Files.get_node_file(utils.Files.params, node_name),
+                    node_name=node_name,
+                    value_name=None,
+                    value=value,
+                )
+            else:
+                utils.file_io.update_config_file(
+                    file=utils.Files.get_node_file(utils.Files.zntrack, node_name),
+                    node_name=node_name,
+                    value_name=value_name,
+                    value=value,
+                )
 
 
 def nodify(
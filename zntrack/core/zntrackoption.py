@@ -56,12 +56,18 @@ class ZnTrackOption(zninit.Descriptor):
         The internal ZnType to select the correct ZnTrack behaviour
     allow_lazy: bool, default=True
         Allow this option to be lazy loaded.
+    compact: bool, default=False
+        Write the json file of this option without any whitespace.
+    compression: utils.compression.Codec, default=None
+        Compress the json file of this option with the given codec.
     """
 
     file = None
     dvc_option: str = None
     zn_type: utils.ZnTypes = None
     allow_lazy: bool = True
+    compact: bool = False
+    compression: utils.compression.Codec = None
 
     def __init__(self, default=zninit.descriptor.Empty, **kwargs):
         """Constructor for ZnTrackOptions
@@ -72,6 +78,15 @@ class ZnTrackOption(zninit.Descriptor):
             The default value of the descriptor
         filename:
             part of the kwargs, optional filename overwrite.
+        compact: bool, default = False
+            part of the kwargs, write the json file of e.g. zn.outs / zn.metrics
+            without any whitespace. This is useful for large outputs. If multiple
+            options share a file, it is compact if any of them uses compact=True.
+        compression: str, default = None
+            part of the kwargs, compress the json file of e.g. zn.outs / zn.metadata
+            with the given codec, e.g. "gzip" writes 'nodes/<node_name>/outs.json.gz'.
+            Options with the same codec share a file. Compressed metrics can not be
+            read by 'dvc metrics'. See 'zntrack.utils.compression' for all codecs.
 
         Raises
         ------
@@ -88,6 +103,10 @@ class ZnTrackOption(zninit.Descriptor):
             self.dvc_option = utils.DVCOptions(self.__class__.__name__).value
 
         self.filename = kwargs.pop("filename", self.dvc_option)
+        self.compact = kwargs.pop("compact", False)
+        compression = kwargs.pop("compression", None)
+        if compression is not None:
+            self.compression = utils.compression.get_codec(compression)
         super().__init__(default=default, **kwargs)
 
     @property
@@ -155,8 +174,6 @@ class ZnTrackOption(zninit.Descriptor):
             instance.__dict__[self.name] = copy.deepcopy(self.default)
 
     def __get__(self, instance, owner=None):
-        self._instance = instance
-
         if instance is None:
             return self
         else:
@@ -166,8 +183,31 @@ class ZnTrackOption(zninit.Descriptor):
     def get_filename(self, instance) -> pathlib.Path:
         """Get the name of the file this ZnTrackOption will save its values to"""
         if uses_node_name(self.zn_type, instance) is None:
-            return pathlib.Path("nodes", instance.node_name, f"{self.filename}.json")
-        return pathlib.Path(self.file)
+            suffix = "" if self.compression is None else self.compression.suffix
+            return pathlib.Path(
+                "nodes", instance.node_name, f"{self.filename}.json{suffix}"
+            )
+        return utils.Files.get_node_file(pathlib.Path(self.file), instance.node_name)
+
+    def prepare_run(self, instance):
+        """Prepare this option before 'Node.run' is called
+
+        Options that write results during the run, e.g. 'zn.plots(append=True)',
+        can overwrite this method.
+        """
+
+    def get_dvc_outputs(self, instance) -> typing.List[typing.Tuple[str, pathlib.Path]]:
+        """Get all files written by this option together with their DVC option
+
+        Only used for values tracked by DVC, e.g. zn.outs. Options that write
+        multiple files can overwrite this method.
+
+        Returns
+        -------
+        list[tuple[str, pathlib.Path]]:
+            A list of (dvc_args, file), e.g. [("outs", "nodes/<node_name>/outs.json")]
+        """
+        return [(self.dvc_args, self.get_filename(instance))]
 
     def save(self, instance):
         """Save this descriptor for the given instance to file
@@ -182,11 +222,24 @@ class ZnTrackOption(zninit.Descriptor):
         if instance.__dict__.get(self.name) is utils.LazyOption:
             # do not save anything if __get__/__set__ was never used
             return
+        value = self.__get__(instance, self.owner)
         utils.file_io.update_config_file(
             file=self.get_filename(instance),
             node_name=uses_node_name(self.zn_type, instance),
             value_name=self.name,
-            value=self.__get__(instance, self.owner),
+            value=value,
+            compact=self.is_compact(instance),
+        )
+
+    def is_compact(self, instance) -> bool:
+        """Check if the file of this option is written as compact json
+
+        This is the case if any option that shares the file uses compact=True.
+        """
+        file = self.get_filename(instance)
+        return any(
+            option.compact and option.get_filename(instance) == file
+            for option in zninit.get_descriptors(ZnTrackOption, self=instance)
         )
 
     def mkdir(self, instance):
@@ -238,17 +291,21 @@ class ZnTrackOption(zninit.Descriptor):
             returns the value loaded from file/s for the given instance.
         """
         file = self.get_filename(instance)
+        node_name = uses_node_name(self.zn_type, instance)
         try:
-            file_content = utils.file_io.read_file(file)
+            if node_name is not None:
+                # only parse the entry of this Node, if the file is indexed
+                file_content = utils.file_io.read_file_entry(file, node_name)
+            else:
+                file_content = utils.file_io.read_file(file)
         except FileNotFoundError as err:
             raise self._get_loading_errors(instance) from err
+        except KeyError:
+            file_content = {}
         # The problem here is, that I can not / don't want to load all Nodes but
         # only the ones, that are in [self.node_name][self.name] for deserializing
         try:
-            if uses_node_name(self.zn_type, instance) is not None:
-                values = utils.decode_dict(file_content[instance.node_name][self.name])
-            else:
-                values = utils.decode_dict(file_content[self.name])
+            values = utils.decode_dict(file_content[self.name])
         except KeyError as err:
             raise self._get_loading_errors(instance) from err
         log.debug(f"Loading {instance.node_name} from {file}: ({values})")
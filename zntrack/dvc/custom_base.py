@@ -17,9 +17,6 @@ class DVCOption(ZnTrackOption):
 
     def __get__(self, instance, owner=None):
         """Overwrite getter to replace nwd placeholder when read the first time"""
-
-        self._instance = instance
-
         if instance is None:
             return self
         else:
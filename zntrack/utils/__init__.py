@@ -1,6 +1,13 @@
 """Standard python init file for the utils directory"""
 
-from zntrack.utils import exceptions, file_io, helpers
+from zntrack.utils import (
+    compression,
+    content_store,
+    exceptions,
+    file_io,
+    helpers,
+    json_engine,
+)
 from zntrack.utils.config import Files, config
 from zntrack.utils.nwd import nwd
 from zntrack.utils.structs import (
@@ -35,6 +42,9 @@ __all__ = [
     "deprecated",
     ZnTypes.__name__,
     "file_io",
+    "json_engine",
+    "compression",
+    "content_store",
     "exceptions",
     Files.__name__,
     "check_type",
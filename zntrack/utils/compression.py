@@ -0,0 +1,115 @@
+"""Description: Compression codecs for the files written by ZnTrack
+
+A compressed file is identified by an additional suffix, e.g. 'outs.json.gz'.
+'file_io.read_file' and 'file_io.write_file' compress and decompress such files
+transparently. The compressed files are reproducible, i.e. the same content always
+results in the same bytes, so DVC does not detect changes where there are none.
+
+Codecs
+------
+gzip:
+    '.gz' using the python standard library.
+bz2:
+    '.bz2' using the python standard library.
+lzma:
+    '.xz' using the python standard library.
+zstd:
+    '.zst' requires 'pip install zstandard'.
+lz4:
+    '.lz4' requires 'pip install lz4'.
+"""
+import bz2
+import dataclasses
+import gzip
+import importlib
+import lzma
+import pathlib
+import typing
+
+
+def _import_module(name: str, package: str):
+    """Import the module of an optional codec"""
+    try:
+        return importlib.import_module(name)
+    except ImportError as err:
+        raise ImportError(
+            f"The compression requires '{package}'. Install it via 'pip install"
+            f" {package}'."
+        ) from err
+
+
+def _open_gzip(fileobj: typing.BinaryIO, mode: str) -> typing.BinaryIO:
+    """Open a gzip stream without the file name and time stamp in the header"""
+    return gzip.GzipFile(filename="", mode=mode, fileobj=fileobj, mtime=0)
+
+
+def _open_zstd(fileobj: typing.BinaryIO, mode: str) -> typing.BinaryIO:
+    """Open a zstandard stream"""
+    zstandard = _import_module("zstandard", package="zstandard")
+    return zstandard.open(fileobj, mode, closefd=False)
+
+
+def _open_lz4(fileobj: typing.BinaryIO, mode: str) -> typing.BinaryIO:
+    """Open a lz4 frame stream"""
+    lz4_frame = _import_module("lz4.frame", package="lz4")
+    return lz4_frame.LZ4FrameFile(fileobj, mode)
+
+
+@dataclasses.dataclass(frozen=True)
+class Codec:
+    """Compression codec
+
+    Attributes
+    ----------
+    name: str
+        The name to select the codec, e.g. zn.outs(compression=<name>)
+    suffix: str
+        The suffix that is appended to the file name, e.g. '.gz'
+    opener: callable
+        opener(fileobj, mode) returns a binary stream that compresses / decompresses
+        from / to the given binary file object. Closing the stream must not close
+        the file object.
+    """
+
+    name: str
+    suffix: str
+    opener: typing.Callable[[typing.BinaryIO, str], typing.BinaryIO]
+
+    def open(self, fileobj: typing.BinaryIO, mode: str = "rb") -> typing.BinaryIO:
+        """Open a compressed stream for reading ("rb") or writing ("wb")"""
+        return self.opener(fileobj, mode)
+
+
+CODECS: typing.Dict[str, Codec] = {
+    codec.name: codec
+    for codec in [
+        Codec(name="gzip", suffix=".gz", opener=_open_gzip),
+        Codec(name="bz2", suffix=".bz2", opener=bz2.BZ2File),
+        Codec(name="lzma", suffix=".xz", opener=lzma.LZMAFile),
+        Codec(name="zstd", suffix=".zst", opener=_open_zstd),
+        Codec(name="lz4", suffix=".lz4", opener=_open_lz4),
+    ]
+}
+
+
+def get_codec(name: str) -> Codec:
+    """Get the codec with the given name
+
+    Raises
+    ------
+    ValueError: if the codec does not exist
+    """
+    try:
+        return CODECS[name]
+    except KeyError as err:
+        raise ValueError(
+            f"Compression '{name}' is not supported. Use one of {list(CODECS)}."
+        ) from err
+
+
+def get_file_codec(file: pathlib.Path) -> typing.Optional[Codec]:
+    """Get the codec of a file from its suffix or None if it is not compressed"""
+    for codec in CODECS.values():
+        if file.suffix == codec.suffix:
+            return codec
+    return None
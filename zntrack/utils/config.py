@@ -1,6 +1,7 @@
 """Description: Configuration File for ZnTrack"""
 import dataclasses
 import logging
+import typing
 from pathlib import Path
 
 
@@ -27,12 +28,73 @@ class Config:
         runs. If you encounter any issues you can set it to logging.INFO for more in-depth
         information. DEBUG level can produce a lot of useful information for more complex
         issues.
+    file_cache: bool, default = True
+        Cache the parsed content of params.yaml / zntrack.json / dvc.yaml in memory
+        until the file is modified. Outputs of the Nodes are not cached.
+    file_cache_size: int, default = 128
+        The maximum number of files held in the file cache.
+    json_engine: str, default = "json"
+        The library used for reading and writing json files, one of 'json', 'orjson'
+        or 'msgspec'. See 'zntrack.utils.json_engine' for more information.
+    atomic_writes: bool, default = True
+        Write files such as params.yaml / zntrack.json / nodes/<node_name>/outs.json to
+        a temporary file first and replace the original file afterwards. This way,
+        a killed process does not leave truncated files behind.
+    fsync: bool, default = True
+        Flush atomically written files to disk before replacing the original file.
+        Disabling this is faster, e.g. for scratch runs, but a system crash can lead
+        to data loss.
+    file_locking: bool, default = True
+        Lock files such as params.yaml / zntrack.json during read-modify-write cycles,
+        so that multiple processes can save Nodes concurrently.
+    lock_timeout: float, default = 60
+        The maximum time in seconds to wait for a file lock.
+    sharded_config: bool, default = False
+        Store the parameters and zntrack data of every Node in
+        'nodes/<node_name>/params.yaml' and 'nodes/<node_name>/zntrack.json' instead
+        of the global params.yaml / zntrack.json. Saving a Node then only touches its
+        own files and DVC only tracks the parameters of the respective Node.
+    json_indent: int|None, default = 4
+        The indentation of the json files written by ZnTrack. Use None to write
+        compact json without any whitespace. Options such as 'zn.outs(compact=True)'
+        always write compact json.
+    config_index: bool, default = False
+        Write the byte offsets of every Node in params.yaml / zntrack.json to an index
+        in '.dvc/tmp/zntrack-index', see 'file_io.get_index_file'. Loading a Node then
+        only parses its own entry instead of the whole file. The index is ignored as
+        soon as the file is modified otherwise, e.g. by a git checkout.
+    content_store: Path, default = None
+        Store the outputs in 'nodes/' once per unique content in this directory, e.g.
+        '.zntrack/store', and hardlink them into 'nodes/<node_name>/'. This reduces
+        disk usage and write time if many Nodes have identical outputs. The stored
+        files are read-only. 'Node.write_graph' saves the store for the stages run
+        by 'dvc repro'. See 'zntrack.utils.content_store' for more information.
+    auto_format_threshold: int, default = 1 MiB
+        The size in bytes above which 'zn.outs(format="auto")' stores e.g. numpy arrays
+        in a binary format instead of json.
+    native_stages: bool, default = False
+        Write the stage of 'Node.write_graph' directly to the 'dvc.yaml' instead of
+        calling 'dvc stage add' in a subprocess, which takes about a second per Node.
+        The stage is identical, but DVC does not validate it until e.g. 'dvc repro'.
     """
 
     nb_name: str = None
     nb_class_path: Path = Path("src")
     lazy: bool = True
     allow_empty_loading: bool = False
+    file_cache: bool = True
+    file_cache_size: int = 128
+    json_engine: str = "json"
+    atomic_writes: bool = True
+    fsync: bool = True
+    file_locking: bool = True
+    lock_timeout: float = 60
+    sharded_config: bool = False
+    json_indent: typing.Optional[int] = 4
+    config_index: bool = False
+    content_store: typing.Optional[Path] = None
+    auto_format_threshold: int = 2**20
+    native_stages: bool = False
     _log_level: int = dataclasses.field(default=logging.WARNING, init=False, repr=True)
 
     @property
@@ -60,5 +122,30 @@ class Files:
     params: Path = Path("params.yaml")
     dvc: Path = Path("dvc.yaml")
 
+    @classmethod
+    def get_node_file(cls, file: Path, node_name: str) -> Path:
+        """Get the params.yaml / zntrack.json that holds the data of the given Node
+
+        Parameters
+        ----------
+        file: Path
+            Either Files.params or Files.zntrack. Other files are returned unchanged.
+        node_name: str
+            The name of the Node
+
+        Returns
+        -------
+        Path:
+            'nodes/<node_name>/<file>' if 'config.sharded_config' is set or the file
+            already exists, so that Nodes can always be loaded independent of the
+            config. Otherwise, the global file is returned.
+        """
+        if file not in (cls.params, cls.zntrack):
+            return file
+        shard = Path("nodes", node_name, file.name)
+        if config.sharded_config or shard.exists():
+            return shard
+        return file
+
 
 config = Config()
@@ -0,0 +1,146 @@
+"""Description: Content-addressed store for the outputs of Nodes
+
+If 'config.content_store' is set, every file in 'nodes/' that is written by ZnTrack,
+e.g. 'nodes/<node_name>/outs.json', is stored once per unique content as
+'<content_store>/<digest[:2]>/<digest[2:]>' and hardlinked into the node directory.
+Nodes with identical outputs, e.g. from parameter sweeps, then share the same blob.
+
+The blobs are read-only, so a hardlinked file can not be modified in place.
+ZnTrack always replaces such files atomically. If hardlinks are not supported,
+e.g. because the store is on another device, the blob is copied instead.
+
+'dvc repro' runs every stage in a new process with the default config. Therefore,
+'Node.write_graph' saves the store of the project in '.zntrack/config.json', which
+is used if 'config.content_store' is not set.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import typing
+
+from zntrack.utils.config import Files, config
+
+SETTINGS_FILE = pathlib.Path(".zntrack", "config.json")
+
+
+def hash_bytes(data: bytes) -> str:
+    """Get the digest of the given bytes"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def hash_file(file: pathlib.Path) -> str:
+    """Get the digest of the content of the given file"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file, "rb") as handle:
+        for block in iter(lambda: handle.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_store() -> typing.Optional[pathlib.Path]:
+    """Get the 'config.content_store' or otherwise the saved store of the project"""
+    if config.content_store is not None:
+        return pathlib.Path(config.content_store)
+    try:
+        settings = json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return pathlib.Path(settings["content_store"])
+
+
+def save_store():
+    """Save the 'config.content_store' for the stage processes of 'dvc repro'
+
+    If the store is not set, the saved store is removed. This way, the config of the
+    last 'Node.write_graph' applies to all Nodes of the project.
+    """
+    if config.content_store is None:
+        SETTINGS_FILE.unlink(missing_ok=True)
+        return
+    text = json.dumps({"content_store": pathlib.Path(config.content_store).as_posix()})
+    if SETTINGS_FILE.exists() and SETTINGS_FILE.read_text(encoding="utf-8") == text:
+        return
+    SETTINGS_FILE.parent.mkdir(exist_ok=True, parents=True)
+    SETTINGS_FILE.write_text(text, encoding="utf-8")
+
+
+def get_blob(digest: str) -> pathlib.Path:
+    """Get the file in the store for the given digest"""
+    return pathlib.Path(get_store(), digest[:2], digest[2:])
+
+
+def uses_store(file: pathlib.Path) -> bool:
+    """Check if the given file is written to the content store
+
+    Only outputs in 'nodes/' are stored, but not the configuration files of
+    'config.sharded_config'.
+    """
+    return (
+        config.atomic_writes
+        and file.parts[:1] == ("nodes",)
+        and file.name not in (Files.params.name, Files.zntrack.name)
+        and get_store() is not None
+    )
+
+
+def link(blob: pathlib.Path, file: pathlib.Path):
+    """Atomically replace the file with a hardlink to the blob"""
+    _, tmp_file = tempfile.mkstemp(
+        dir=file.parent, prefix=f".{file.name}.", suffix=".tmp"
+    )
+    os.remove(tmp_file)
+    try:
+        try:
+            os.link(blob, tmp_file)
+        except OSError:
+            shutil.copyfile(blob, tmp_file)
+        os.replace(tmp_file, file)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_file)
+        raise
+
+
+def link_existing(file: pathlib.Path, data: bytes) -> bool:
+    """Link the file to the blob with the given content if it is already stored
+
+    This way, writing the file can be skipped entirely.
+
+    Returns
+    -------
+    bool: True if the blob exists and the file was linked.
+    """
+    blob = get_blob(hash_bytes(data))
+    if not blob.exists():
+        return False
+    link(blob, file)
+    return True
+
+
+def add_file(tmp_file: pathlib.Path, file: pathlib.Path):
+    """Move a written file into the store and link it to its destination
+
+    Parameters
+    ----------
+    tmp_file: pathlib.Path
+        The written file. It is moved to the store or removed if the
+        content is already stored.
+    file: pathlib.Path
+        The destination which is replaced with a hardlink to the blob.
+    """
+    blob = get_blob(hash_file(tmp_file))
+    if blob.exists():
+        os.remove(tmp_file)
+    else:
+        blob.parent.mkdir(exist_ok=True, parents=True)
+        os.chmod(tmp_file, 0o444)
+        try:
+            os.replace(tmp_file, blob)
+        except OSError:
+            # e.g. the store is on another device
+            shutil.move(tmp_file, blob)
+    link(blob, file)
@@ -22,3 +22,18 @@ class GraphNotAvailableError(Exception):
 
     Trying to access graph features such as zn.params or dvc.outs which are not available
     """
+
+
+class FileLockTimeoutError(TimeoutError):
+    """A file lock could not be acquired
+
+    Another process or thread did not release the lock on e.g. params.yaml within
+    'zntrack.config.lock_timeout'.
+    """
+
+
+class CyclicGraphError(ValueError):
+    """The dependencies of the Nodes contain a cycle
+
+    The Nodes can not be executed in any order.
+    """
@@ -1,17 +1,178 @@
+import collections
+import contextlib
+import dataclasses
+import hashlib
 import json
 import logging
+import os
 import pathlib
+import pickle
+import tempfile
+import threading
+import time
 import typing
 
 import yaml
-import znjson
+
+from zntrack.utils import compression, content_store, json_engine
+from zntrack.utils.config import Files, config
+from zntrack.utils.exceptions import DVCProcessError, FileLockTimeoutError
 
 log = logging.getLogger(__name__)
 
+try:
+    # use the LibYAML bindings if available.
+    from yaml import CSafeDumper as YAMLDumper
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeDumper as YAMLDumper
+    from yaml import SafeLoader as YAMLLoader
+
+# The umask can only be read by setting it, so do it once on import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+try:
+    import fcntl
+except ImportError:
+    # e.g. on Windows the file locks only work between threads
+    fcntl = None
+
+
+@dataclasses.dataclass
+class _Transaction:
+    """State of an active 'config_transaction'
+
+    Attributes
+    ----------
+    files: dict
+        The pending {file: content} to be written at the end of the transaction
+    locks: contextlib.ExitStack
+        The file locks which are held until the transaction is finished
+    compact: set
+        The pending files that are written as compact json
+    """
+
+    files: typing.Dict[pathlib.Path, dict] = dataclasses.field(default_factory=dict)
+    locks: contextlib.ExitStack = dataclasses.field(default_factory=contextlib.ExitStack)
+    compact: typing.Set[pathlib.Path] = dataclasses.field(default_factory=set)
+
+
+class _TransactionStack(threading.local):
+    """The running 'config_transaction' of the current thread"""
+
+    def __init__(self):
+        super().__init__()
+        self.transactions: typing.List[_Transaction] = []
+
+
+# every thread has its own transaction, e.g. for Nodes running in a thread pool
+_TRANSACTIONS = _TransactionStack()
+
+
+class ParsedFileCache:
+    """Process-wide LRU cache for the parsed content of json/yaml files
+
+    Entries are keyed by the absolute path together with 'st_mtime_ns', 'st_size' and
+    'st_ino' of the file, so any modification, also by an external process,
+    invalidates the entry. The parsed content is stored pickled and every lookup
+    returns a fresh copy, which can be modified without affecting the cache.
+    """
+
+    def __init__(self):
+        self._entries: typing.OrderedDict[str, tuple] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(file: pathlib.Path) -> typing.Tuple[str, tuple]:
+        """Get the cache key for the current state of the file
+
+        Raises
+        ------
+        OSError: if the file can not be accessed, e.g. it does not exist.
+        """
+        stat = file.stat()
+        return os.path.abspath(file), (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def get(self, key: typing.Tuple[str, tuple]):
+        """Get a copy of the cached content
+
+        Raises
+        ------
+        KeyError: if the file is not cached or was modified.
+        """
+        path, stat = key
+        with self._lock:
+            cached_stat, data = self._entries[path]
+            if cached_stat != stat:
+                del self._entries[path]
+                raise KeyError(path)
+            self._entries.move_to_end(path)
+        return pickle.loads(data)
+
+    def set(self, key: typing.Tuple[str, tuple], file_content):
+        """Store the parsed content"""
+        path, stat = key
+        data = pickle.dumps(file_content, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[path] = (stat, data)
+            self._entries.move_to_end(path)
+            while len(self._entries) > config.file_cache_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, file: pathlib.Path):
+        """Remove the file from the cache"""
+        with self._lock:
+            self._entries.pop(os.path.abspath(file), None)
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+file_cache = ParsedFileCache()
+# the names of the files that are read repeatedly, including 'config.sharded_config'
+_CACHED_FILES = frozenset([Files.params.name, Files.zntrack.name, Files.dvc.name])
+
+
+def _get_suffix(file: pathlib.Path) -> typing.Tuple[str, compression.Codec]:
+    """Get the suffix of the data format and the codec of a possibly compressed file
+
+    E.g. ('.json', None) for 'outs.json' and ('.json', <gzip>) for 'outs.json.gz'.
+    """
+    codec = compression.get_file_codec(file)
+    if codec is None:
+        return file.suffix, None
+    return file.with_suffix("").suffix, codec
+
+
+def _parse_file(file: pathlib.Path) -> dict:
+    """Read and parse a json/yaml file"""
+    suffix, codec = _get_suffix(file)
+    if suffix not in [".yaml", ".yml", ".json"]:
+        raise ValueError(f"File with suffix {file.suffix} is not supported")
+    if codec is None:
+        text = file.read_text(encoding="utf-8")
+    else:
+        with file.open("rb") as handle, codec.open(handle) as stream:
+            text = stream.read()
+    if suffix == ".json":
+        return json_engine.loads(text)
+    return yaml.load(text, Loader=YAMLLoader)
+
 
 def read_file(file: pathlib.Path) -> dict:
     """Read a json/yaml file without the znjson.Decoder
 
+    If 'config.file_cache' is enabled, the parsed content of the configuration files,
+    i.e. params.yaml / zntrack.json / dvc.yaml, is cached until the file is modified.
+    Every call returns a copy of the content that can be modified freely. Outputs
+    such as 'nodes/<node_name>/outs.json' are read once and not cached.
+
     Parameters
     ----------
     file: pathlib.Path
@@ -27,19 +188,282 @@ def read_file(file: pathlib.Path) -> dict:
     dict:
         Content of the json/yaml file
     """
+    if not config.file_cache or file.name not in _CACHED_FILES:
+        return _parse_file(file)
+    try:
+        key = file_cache.get_key(file)
+    except OSError:
+        # let '_parse_file' raise the appropriate error
+        return _parse_file(file)
+    with contextlib.suppress(KeyError):
+        return file_cache.get(key)
+    file_content = _parse_file(file)
+    file_cache.set(key, file_content)
+    return file_content
+
+
+def _read_indexed_entry(file: pathlib.Path, key: str) -> dict:
+    """Parse a single top level entry of the file using its byte offset index
+
+    Returns
+    -------
+    dict|None:
+        {key: value} or an empty dict if the key does not exist. None is returned,
+        if no valid index is available.
+    """
+    try:
+        with open(get_index_file(file), "rb") as handle:
+            index = json.loads(handle.read())
+        with open(file, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            if index["stat"] != [stat.st_mtime_ns, stat.st_size, stat.st_ino]:
+                return None
+            if key not in index["entries"]:
+                return {}
+            start, stop = index["entries"][key]
+            handle.seek(start)
+            text = handle.read(stop - start).decode("utf-8")
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
     if file.suffix in [".yaml", ".yml"]:
-        file_content = yaml.safe_load(file.read_text())
-    elif file.suffix == ".json":
-        file_content = json.loads(file.read_text())
+        entry = yaml.load(text, Loader=YAMLLoader)
     else:
-        raise ValueError(f"File with suffix {file.suffix} is not supported")
-    return file_content
+        entry = json_engine.loads(f"{{{text}}}")
+    if not isinstance(entry, dict) or list(entry) != [key]:
+        return None
+    return entry
+
+
+def read_file_entry(file: pathlib.Path, key: str):
+    """Read a single top level entry, e.g. of a Node, from a json/yaml file
 
+    If an up-to-date index written by 'write_file(..., index=True)' is available,
+    only the requested entry is parsed. Otherwise, this is equivalent to
+    'read_file(file)[key]'.
 
-def write_file(file: pathlib.Path, value: dict, mkdir: bool = True):
+    Parameters
+    ----------
+    file: pathlib.Path
+        The file to read
+    key: str
+        The top level key, e.g. the node_name
+
+    Raises
+    ------
+    FileNotFoundError: if the file does not exist
+    KeyError: if the key does not exist
+
+    Returns
+    -------
+    any:
+        A copy of the content of 'file[key]'
+    """
+    entry = _read_indexed_entry(file, key)
+    if entry is None:
+        return read_file(file)[key]
+    return entry[key]
+
+
+def _has_stable_yaml_layout(value) -> bool:
+    """Check if LibYAML produces the same output as the pure python emitter
+
+    Both emitters only differ in the line folding of double-quoted strings and
+    in the representation of empty or long mapping keys. Strings are double-quoted
+    only if they contain characters other than printable ASCII.
+    """
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if not (item.isascii() and item.isprintable()):
+                return False
+        elif isinstance(item, dict):
+            if not all(0 < len(str(key)) < 120 for key in item):
+                return False
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return True
+
+
+@contextlib.contextmanager
+def atomic_open(
+    file: pathlib.Path, mode: str = "w", fsync: bool = None, store: bool = True, **kwargs
+) -> typing.IO:
+    """Open a file for writing which is only replaced once writing has finished
+
+    The data is written to a temporary file in the same directory, which replaces
+    the given file when the context is left without an exception. Therefore, a killed
+    process never leaves a truncated file behind. If 'fsync' is set, the data
+    is flushed to disk before replacing the file.
+    If 'config.atomic_writes' is disabled, the file is written directly.
+    Outputs in 'nodes/' are added to the 'config.content_store', if it is set.
+
+    Parameters
+    ----------
+    file: pathlib.Path
+        The file to write to
+    mode: str, default = "w"
+        The mode to open the file with, e.g. "w" or "wb"
+    fsync: bool, default = None
+        Flush the data to disk before replacing the file. If None, 'config.fsync'
+        is used.
+    store: bool, default = True
+        Add the file to the 'config.content_store', if it is used for the file.
+        Disable this for intermediate content that is replaced again.
+    kwargs:
+        Additional keyword arguments passed to 'open', e.g. newline=""
+
+    Yields
+    ------
+    file object
+    """
+    if fsync is None:
+        fsync = config.fsync
+    if not config.atomic_writes:
+        with file.open(mode, **kwargs) as handle:
+            yield handle
+        return
+
+    file_descriptor, tmp_file = tempfile.mkstemp(
+        dir=file.parent, prefix=f".{file.name}.", suffix=".tmp"
+    )
+    try:
+        with open(file_descriptor, mode, **kwargs) as handle:
+            yield handle
+            if fsync:
+                handle.flush()
+                os.fsync(handle.fileno())
+        if store and content_store.uses_store(file):
+            content_store.add_file(tmp_file, file)
+        else:
+            # mkstemp creates files only readable by the owner
+            os.chmod(tmp_file, 0o666 & ~_UMASK)
+            os.replace(tmp_file, file)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_file)
+        raise
+
+    if fsync:
+        # persist the rename, not supported on e.g. Windows
+        with contextlib.suppress(OSError):
+            directory = os.open(file.parent, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+
+def _get_repository_path(path) -> typing.Optional[typing.Tuple[str, str]]:
+    """Get the DVC repository in the working directory and the path relative to it
+
+    Both are resolved with 'os.path.realpath'.
+
+    Returns
+    -------
+    tuple[str, str]|None:
+        (root, relative path) or None if there is no DVC repository or the path
+        is outside of it.
+    """
+    root = os.path.realpath(os.getcwd())
+    path = os.path.realpath(path)
+    if os.path.isdir(os.path.join(root, ".dvc")) and path.startswith(root + os.sep):
+        return root, os.path.relpath(path, root)
+    return None
+
+
+def get_index_file(file: pathlib.Path) -> pathlib.Path:
+    """Get the byte offset index of the given file
+
+    Inside a DVC repository, the index is stored in '.dvc/tmp', which is ignored by
+    git, e.g. '.dvc/tmp/zntrack-index/zntrack.json.index'. Otherwise, it is stored
+    next to the file, e.g. '.zntrack.json.index'.
+    """
+    repository_path = _get_repository_path(file)
+    if repository_path is not None:
+        root, path = repository_path
+        return pathlib.Path(root, ".dvc", "tmp", "zntrack-index", f"{path}.index")
+    return file.with_name(f".{file.name}.index")
+
+
+def _dump_entries(file: pathlib.Path, value: dict, compact: bool) -> tuple:
+    """Serialize every top level entry of value separately
+
+    The concatenation 'prefix + separator.join(entries) + suffix' is identical to
+    the output of 'write_file' without an index.
+
+    Returns
+    -------
+    prefix: str
+    entries: dict
+        {key: text} of the serialized top level entries
+    separator: str
+    suffix: str
+    """
+    if file.suffix in [".yaml", ".yml"]:
+        entries = {}
+        for key in sorted(value):
+            entry = {key: value[key]}
+            dumper = YAMLDumper if _has_stable_yaml_layout(entry) else yaml.SafeDumper
+            entries[key] = yaml.dump(entry, Dumper=dumper, indent=4)
+        return "", entries, "", ""
+    indent = None if compact else config.json_indent
+    # derive the layout of the selected JSON engine from a minimal example
+    probe = json_engine.dumps({"": 0}, indent=indent)
+    key_start, value_start = probe.index('""'), probe.rindex("0")
+    padding = probe[probe.find("\n") + 1 : key_start] if "\n" in probe else ""
+    key_separator = probe[key_start + 2 : value_start]
+    entries = {}
+    for key, entry in value.items():
+        text = json_engine.dumps(entry, indent=indent)
+        if padding:
+            # a new line can only occur in the layout, strings are escaped
+            text = text.replace("\n", f"\n{padding}")
+        entries[key] = f"{json_engine.dumps(key, indent=None)}{key_separator}{text}"
+    prefix = probe[:key_start]
+    return prefix, entries, f",{prefix[1:]}", probe[value_start + 1 :]
+
+
+def _write_indexed_file(file: pathlib.Path, value: dict, compact: bool):
+    """Write the file together with a byte offset index of its top level entries"""
+    prefix, entries, separator, suffix = _dump_entries(file, value, compact)
+    index = {}
+    position = len(prefix.encode())
+    for idx, (key, text) in enumerate(entries.items()):
+        if idx > 0:
+            position += len(separator.encode())
+        size = len(text.encode())
+        index[key] = [position, position + size]
+        position += size
+    with atomic_open(file, newline="", encoding="utf-8") as handle:
+        handle.write(prefix + separator.join(entries.values()) + suffix)
+    stat = os.stat(file)
+    index_file = get_index_file(file)
+    index_file.parent.mkdir(exist_ok=True, parents=True)
+    with atomic_open(index_file) as handle:
+        handle.write(
+            json.dumps(
+                {"stat": [stat.st_mtime_ns, stat.st_size, stat.st_ino], "entries": index}
+            )
+        )
+
+
+def write_file(
+    file: pathlib.Path,
+    value: dict,
+    mkdir: bool = True,
+    compact: bool = False,
+    index: bool = False,
+    fsync: bool = None,
+    store: bool = True,
+):
     """Save dict to file
 
-    Store dictionary to json or yaml file
+    Store dictionary to json or yaml file. The file is replaced atomically,
+    see 'atomic_open'. Files with the suffix of a compression codec,
+    e.g. 'outs.json.gz', are compressed, see 'zntrack.utils.compression'.
 
     Parameters
     ----------
@@ -49,35 +473,343 @@ def write_file(file: pathlib.Path, value: dict, mkdir: bool = True):
         Any serializable data to save
     mkdir: bool
         Create a parent directory if necessary
+    compact: bool, default = False
+        Write json without any whitespace. Otherwise, 'config.json_indent' is used.
+        This has no effect on yaml files.
+    index: bool, default = False
+        Additionally write the byte offsets of all top level entries to
+        'get_index_file(file)', which allows 'read_file_entry' to parse a single
+        entry. The content of the file itself is not affected.
+    fsync: bool, default = None
+        Flush the file to disk before replacing it, see 'atomic_open'.
+    store: bool, default = True
+        Add the file to the 'config.content_store', see 'atomic_open'.
     """
     if mkdir:
         file.parent.mkdir(exist_ok=True, parents=True)
 
-    if file.suffix in [".yaml", ".yml"]:
-        file.write_text(yaml.safe_dump(value, indent=4))
-    elif file.suffix == ".json":
-        file.write_text(json.dumps(value, indent=4, cls=znjson.ZnEncoder))
+    file_cache.invalidate(file)
+    # an outdated index must never be used, even if the file stat would match
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(get_index_file(file))
+    suffix, codec = _get_suffix(file)
+    if index and codec is None and value and all(isinstance(key, str) for key in value):
+        _write_indexed_file(file, value, compact)
+        return
+    if suffix in [".yaml", ".yml"]:
+        dumper = YAMLDumper if _has_stable_yaml_layout(value) else yaml.SafeDumper
+        text = yaml.dump(value, Dumper=dumper, indent=4)
+    elif suffix == ".json":
+        text = json_engine.dumps(value, indent=None if compact else config.json_indent)
     else:
         raise ValueError(f"File with suffix {file.suffix} is not supported")
+    if codec is None:
+        if (
+            store
+            and content_store.uses_store(file)
+            and content_store.link_existing(file, text.encode())
+        ):
+            # the same content was written before, e.g. by another Node
+            return
+        # the text is independent of the locale, e.g. non-ascii characters of orjson
+        with atomic_open(file, fsync=fsync, store=store, encoding="utf-8") as handle:
+            handle.write(text)
+    else:
+        with atomic_open(file, "wb", fsync=fsync, store=store) as handle, codec.open(
+            handle, "wb"
+        ) as stream:
+            stream.write(text.encode())
 
 
-def clear_config_file(file: pathlib.Path, node_name: str):
-    """Clear the entries in the files for the given node name
+@dataclasses.dataclass
+class LockStatistics:
+    """Contention metrics of 'file_lock' within this process
+
+    Attributes
+    ----------
+    acquired: int
+        The number of acquired inter-process locks
+    contended: int
+        The number of acquisitions which had to wait for another process or thread
+    timeouts: int
+        The number of acquisitions which failed after 'config.lock_timeout'
+    wait_time: float
+        The total time in seconds spent waiting for locks
+    max_wait_time: float
+        The longest time in seconds spent waiting for a single lock
+    """
+
+    acquired: int = 0
+    contended: int = 0
+    timeouts: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    def reset(self):
+        """Set all metrics to zero"""
+        for field in dataclasses.fields(self):
+            setattr(self, field.name, field.default)
+
+
+lock_statistics = LockStatistics()
+
+
+class _FileLock:
+    """Re-entrant lock between threads and processes for a single file
+
+    The inter-process lock uses 'fcntl.flock' on a separate lock file, see
+    'get_lock_file'. Without 'fcntl', e.g. on Windows, there is no lock file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_file = None if fcntl is None else self.get_lock_file(path)
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self._file_descriptor = None
+
+    @staticmethod
+    def get_lock_file(path: str) -> pathlib.Path:
+        """The file which is locked instead of the given path
+
+        Inside a DVC repository, the lock files are stored in '.dvc/tmp' and named
+        after the real path relative to the repository. This way, processes on other
+        hosts of a shared file system or using another mount point or symlink lock
+        the same file. Otherwise, the temporary directory is used.
+        """
+        repository_path = _get_repository_path(path)
+        if repository_path is not None:
+            root, path = repository_path
+            name = hashlib.sha1(path.encode()).hexdigest()
+            return pathlib.Path(root, ".dvc", "tmp", "zntrack-locks", name)
+        name = hashlib.sha1(os.path.realpath(path).encode()).hexdigest()
+        return pathlib.Path(tempfile.gettempdir(), f"zntrack-{os.getuid()}", name)
+
+    def acquire(self, timeout: float) -> bool:
+        """Acquire the lock between processes
+
+        Returns
+        -------
+        bool: True if the lock was held by another process and had to be waited for.
+
+        Raises
+        ------
+        BlockingIOError: if the lock could not be acquired within the timeout.
+        """
+        if fcntl is None:
+            return False
+        self.lock_file.parent.mkdir(exist_ok=True, parents=True)
+        file_descriptor = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+        start, delay, contended = time.monotonic(), 0.001, False
+        while True:
+            try:
+                fcntl.flock(file_descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                contended = True
+                if time.monotonic() - start > timeout:
+                    os.close(file_descriptor)
+                    raise
+                time.sleep(delay)
+                delay = min(2 * delay, 0.05)
+        self._file_descriptor = file_descriptor
+        return contended
+
+    def release(self):
+        """Release the lock between processes"""
+        if self._file_descriptor is not None:
+            fcntl.flock(self._file_descriptor, fcntl.LOCK_UN)
+            os.close(self._file_descriptor)
+            self._file_descriptor = None
+
+
+_FILE_LOCKS: typing.Dict[str, _FileLock] = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def _reset_locks_after_fork():
+    """Replace the locks in a forked process
+
+    The process pool of 'run_nodes' forks while other Nodes are running in threads.
+    Locks that are held by these threads would never be released in the child.
+    """
+    global _FILE_LOCKS_GUARD  # pylint: disable=global-statement
+    _FILE_LOCKS_GUARD = threading.Lock()
+    _FILE_LOCKS.clear()
+    file_cache._lock = threading.Lock()  # pylint: disable=protected-access
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+def _update_lock_statistics(
+    acquired: int = 0, contended: int = 0, timeouts: int = 0, wait_time: float = 0.0
+):
+    """Thread-safe update of the 'lock_statistics'"""
+    with _FILE_LOCKS_GUARD:
+        lock_statistics.acquired += acquired
+        lock_statistics.contended += contended
+        lock_statistics.timeouts += timeouts
+        lock_statistics.wait_time += wait_time
+        lock_statistics.max_wait_time = max(lock_statistics.max_wait_time, wait_time)
+
+
+@contextlib.contextmanager
+def file_lock(file: pathlib.Path):
+    """Acquire an exclusive lock for the file between threads and processes
+
+    This is an advisory lock, which is used by all read-modify-write operations
+    in this module. The lock is re-entrant within the same thread.
+    It can be disabled via 'config.file_locking'.
 
     Parameters
     ----------
     file: pathlib.Path
-        The file to read from, e.g. params.yaml / zntrack.json
-    node_name: str
-        The name of the Node
+        The file to lock. The file does not need to exist.
+
+    Raises
+    ------
+    FileLockTimeoutError: if the lock can not be acquired within 'config.lock_timeout'.
+    """
+    if not config.file_locking:
+        yield
+        return
+    path = os.path.realpath(file)
+    with _FILE_LOCKS_GUARD:
+        if path not in _FILE_LOCKS:
+            _FILE_LOCKS[path] = _FileLock(path)
+        lock = _FILE_LOCKS[path]
+
+    start = time.monotonic()
+    contended = not lock.thread_lock.acquire(blocking=False)
+    if contended and not lock.thread_lock.acquire(timeout=config.lock_timeout):
+        _update_lock_statistics(timeouts=1)
+        raise FileLockTimeoutError(f"Could not acquire the lock for '{file}'.")
+    try:
+        if lock.depth == 0:
+            try:
+                contended |= lock.acquire(
+                    timeout=config.lock_timeout - (time.monotonic() - start)
+                )
+            except BlockingIOError as err:
+                _update_lock_statistics(timeouts=1)
+                raise FileLockTimeoutError(
+                    f"Could not acquire the lock for '{file}' within"
+                    f" {config.lock_timeout} s. It is held by another process."
+                ) from err
+            wait_time = time.monotonic() - start
+            _update_lock_statistics(
+                acquired=1, contended=int(contended), wait_time=wait_time
+            )
+            if contended:
+                log.debug(f"Waited {wait_time:.3f} s for the lock of '{file}'")
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0:
+                lock.release()
+    finally:
+        lock.thread_lock.release()
+
+
+@contextlib.contextmanager
+def config_transaction():
+    """Batch all updates of configuration files, e.g. params.yaml / zntrack.json
+
+    Inside this context 'update_config_file' and 'clear_config_file' read every file
+    only once and apply all changes in memory. Each modified file is written exactly
+    once when the context is left. Nested transactions are merged into the outermost
+    one. If an exception occurs, no pending changes are written.
+
+    Notes
+    -----
+    'read_file' is not affected and always reads the content from disk.
     """
+    if _TRANSACTIONS.transactions:
+        # join the already running transaction
+        yield
+        return
+    transaction = _Transaction()
+    _TRANSACTIONS.transactions.append(transaction)
+    try:
+        with transaction.locks:
+            yield
+            for file, file_content in transaction.files.items():
+                write_file(
+                    file,
+                    value=file_content,
+                    compact=file in transaction.compact,
+                    index=_uses_index(file),
+                )
+                log.debug(f"Update <{file}> with: {file_content}")
+    finally:
+        _TRANSACTIONS.transactions.pop()
+
+
+def _uses_index(file: pathlib.Path) -> bool:
+    """Check if a byte offset index should be written for the configuration file"""
+    return config.config_index and file in (Files.params, Files.zntrack)
+
+
+def _read_config_file(file: pathlib.Path) -> dict:
+    """Read a configuration file or return the pending content of a transaction
+
+    Inside a transaction, the file lock is held until the transaction is finished.
+    """
+    if _TRANSACTIONS.transactions and file in _TRANSACTIONS.transactions[-1].files:
+        return _TRANSACTIONS.transactions[-1].files[file]
+    if _TRANSACTIONS.transactions:
+        _TRANSACTIONS.transactions[-1].locks.enter_context(file_lock(file))
     try:
         file_content = read_file(file)
     except FileNotFoundError:
         file_content = {}
+    if _TRANSACTIONS.transactions:
+        _TRANSACTIONS.transactions[-1].files[file] = file_content
+    return file_content
+
+
+def _write_config_file(
+    file: pathlib.Path,
+    file_content: dict,
+    compact: bool = False,
+    fsync: bool = None,
+    store: bool = True,
+):
+    """Write a configuration file unless it is part of a running transaction"""
+    if _TRANSACTIONS.transactions:
+        # the content is already stored in the transaction and written on exit
+        _TRANSACTIONS.transactions[-1].files[file] = file_content
+        if compact:
+            _TRANSACTIONS.transactions[-1].compact.add(file)
+        return
+    write_file(
+        file,
+        value=file_content,
+        compact=compact,
+        index=_uses_index(file),
+        fsync=fsync,
+        store=store,
+    )
 
-    _ = file_content.pop(node_name, None)
-    write_file(file, value=file_content)
+
+def clear_config_file(file: pathlib.Path, node_name: str):
+    """Clear the entries in the files for the given node name
+
+    Parameters
+    ----------
+    file: pathlib.Path
+        The file to read from, e.g. params.yaml / zntrack.json
+    node_name: str
+        The name of the Node
+    """
+    with file_lock(file):
+        file_content = _read_config_file(file)
+        _ = file_content.pop(node_name, None)
+        _write_config_file(file, file_content)
 
 
 def update_config_file(
@@ -85,6 +817,9 @@ def update_config_file(
     node_name: typing.Union[str, None],
     value_name: typing.Union[str, None],
     value,
+    compact: bool = False,
+    fsync: bool = None,
+    store: bool = True,
 ):
     """Update a configuration file
 
@@ -104,53 +839,118 @@ def update_config_file(
         be {node_name: value}.
     value:
         The value to write to the file
+    compact: bool, default = False
+        Write the file as compact json, see 'write_file'.
+    fsync: bool, default = None
+        Flush the file to disk before replacing it, see 'atomic_open'.
+    store: bool, default = True
+        Add the file to the 'config.content_store', see 'atomic_open'.
     """
     # Read file
     if node_name is None and value_name is None:
         raise ValueError("Either node_name or value_name must not be None")
 
-    try:
-        file_content = read_file(file)
-    except FileNotFoundError:
-        file_content = {}
-    log.debug(f"Loading <{file}> content: {file_content}")
-    if node_name is None:
-        log.debug(f"Update <{value_name}> with: {value}")
-        file_content[value_name] = value
-    elif value_name is None:
-        log.debug(f"Update <{node_name}> with: {value}")
-        file_content[node_name] = value
-    else:
-        # select primary node name key
-        node_content = file_content.get(node_name, {})
-        log.debug(f"Gathered <{node_name}> content: {node_content}")
-        # update with new value
-        node_content[value_name] = value
-        log.debug(f"Update <{value_name}> with: {value}")
-        # save to file
-        file_content[node_name] = node_content
-    write_file(file, value=file_content)
-    log.debug(f"Update <{file}> with: {file_content}")
+    with file_lock(file):
+        file_content = _read_config_file(file)
+        log.debug(f"Loading <{file}> content: {file_content}")
+        if node_name is None:
+            log.debug(f"Update <{value_name}> with: {value}")
+            file_content[value_name] = value
+        elif value_name is None:
+            log.debug(f"Update <{node_name}> with: {value}")
+            file_content[node_name] = value
+        else:
+            # select primary node name key
+            node_content = file_content.get(node_name, {})
+            log.debug(f"Gathered <{node_name}> content: {node_content}")
+            # update with new value
+            node_content[value_name] = value
+            log.debug(f"Update <{value_name}> with: {value}")
+            # save to file
+            file_content[node_name] = node_content
+        _write_config_file(file, file_content, compact=compact, fsync=fsync, store=store)
+        log.debug(f"Update <{file}> with: {file_content}")
 
 
 def update_desc(file: pathlib.Path, node_name: str, desc: str):
     """Update the 'dvc.yaml' with a description"""
     if desc is not None:
-        file_content = read_file(file)
-        file_content["stages"][node_name]["desc"] = desc
-        write_file(file, value=file_content)
+        with file_lock(file):
+            file_content = _read_config_file(file)
+            file_content["stages"][node_name]["desc"] = desc
+            _write_config_file(file, file_content)
 
 
 def update_meta(file: pathlib.Path, node_name: str, data: dict):
     """Update the file (dvc.yaml) given the Node for 'meta' key with the data"""
     if data is not None:
-        file_content = read_file(file)
-        meta_data = file_content["stages"][node_name].get("meta", {})
-        if not isinstance(meta_data, dict):
-            raise ValueError(
-                "The 'meta' key in the 'dvc.yaml' is not empty or was otherwise modified."
-                " To use 'zntrack.meta' it is not possible to use that field otherwise."
+        with file_lock(file):
+            file_content = _read_config_file(file)
+            meta_data = file_content["stages"][node_name].get("meta", {})
+            if not isinstance(meta_data, dict):
+                raise ValueError(
+                    "The 'meta' key in the 'dvc.yaml' is not empty or was otherwise"
+                    " modified. To use 'zntrack.meta' it is not possible to use that"
+                    " field otherwise."
+                )
+            meta_data.update(data)
+            file_content["stages"][node_name]["meta"] = meta_data
+            _write_config_file(file, file_content)
+
+
+def update_stage(file: pathlib.Path, node_name: str, stage: dict, force: bool = True):
+    """Add the stage of the Node to the 'dvc.yaml'
+
+    Parameters
+    ----------
+    file: pathlib.Path
+        The dvc.yaml file
+    node_name: str
+        The name of the Node
+    stage: dict
+        The stage, see 'zntrack.core.dvcgraph.prepare_dvc_stage'
+    force: bool, default = True
+        Replace an existing stage of the same name.
+
+    Raises
+    ------
+    DVCProcessError: if the stage already exists and force is not set, like the
+        'dvc stage add' subprocess call.
+    """
+    with file_lock(file):
+        file_content = _read_config_file(file)
+        stages = file_content.setdefault("stages", {})
+        if node_name in stages and not force:
+            raise DVCProcessError(
+                f"Stage '{node_name}' already exists in '{file}'. Use 'force=True' to"
+                " overwrite it."
             )
-        meta_data.update(data)
-        file_content["stages"][node_name]["meta"] = meta_data
-        write_file(file, value=file_content)
+        stages[node_name] = stage
+        _write_config_file(file, file_content)
+
+
+def _in_git_repository() -> bool:
+    """Check if the working directory is part of a git repository"""
+    cwd = pathlib.Path.cwd()
+    return any((path / ".git").exists() for path in (cwd, *cwd.parents))
+
+
+def update_gitignore(files: typing.List[pathlib.Path]):
+    """Add the files to the '.gitignore' in their directory, like DVC does
+
+    Nothing is written outside a git repository or if the file is already listed.
+    """
+    if not files or not _in_git_repository():
+        return
+    for file in files:
+        gitignore = file.parent / ".gitignore"
+        # escape the git wildmatch meta characters, see 'pathspec'
+        entry = "/" + "".join(f"\\{x}" if x in "[]!*#?" else x for x in file.name)
+        gitignore.parent.mkdir(exist_ok=True, parents=True)
+        with open(gitignore, "a+", encoding="utf-8") as handle:
+            handle.seek(0)
+            content = handle.read()
+            if f"{entry}\n" in content.splitlines(keepends=True):
+                continue
+            prefix = "" if content == "" or content.endswith("\n") else "\n"
+            handle.write(f"{prefix}{entry}\n")
@@ -0,0 +1,140 @@
+"""Description: Interchangeable JSON engines for the files written by ZnTrack
+
+The engine is selected via 'zntrack.config.json_engine'. All engines produce standard
+JSON which can always be read by the python 'json' library.
+
+Engines
+-------
+json:
+    The python standard library. This is the default.
+orjson:
+    Use 'orjson' for encoding and decoding. Indented output always uses an indentation
+    of two spaces and non-ascii characters are not escaped. Values which 'orjson'
+    would serialize differently, e.g. NaN, are encoded with the standard library.
+msgspec:
+    Use 'msgspec' for decoding. Encoding uses the python standard library, because
+    'msgspec' serializes e.g. dataclasses natively without the znjson converters.
+"""
+import enum
+import functools
+import importlib
+import json
+import logging
+import math
+import typing
+
+import znjson
+
+from zntrack.utils.config import config
+
+log = logging.getLogger(__name__)
+
+ENGINES = ("json", "orjson", "msgspec")
+
+
+@functools.lru_cache(maxsize=None)
+def _import_engine(name: str):
+    """Import the module of the given engine"""
+    if name not in ENGINES:
+        raise ValueError(f"JSON engine '{name}' is not supported. Use one of {ENGINES}.")
+    try:
+        return importlib.import_module(name)
+    except ImportError as err:
+        raise ImportError(
+            f"The JSON engine '{name}' is not installed. Install it via 'pip install"
+            f" {name}' or change 'zntrack.config.json_engine'."
+        ) from err
+
+
+def _znjson_default(obj):
+    """Serialize obj with the registered znjson converters"""
+    return znjson.ZnEncoder().default(obj)
+
+
+def _requires_json(value) -> bool:
+    """Check for values that 'orjson' serializes differently than 'json'
+
+    'orjson' writes NaN and +-Infinity as null and serializes any enum.Enum, which
+    'json' passes to the znjson converters.
+    """
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            if not math.isfinite(obj):
+                return True
+        elif isinstance(obj, enum.Enum):
+            return True
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return False
+
+
+def dumps(value, indent: typing.Optional[int] = 4) -> str:
+    """Serialize value to a JSON string using the znjson converters
+
+    Parameters
+    ----------
+    value: any
+        The data to serialize.
+    indent: int|None, default = 4
+        The indentation of the output. Use None for compact output.
+
+    Returns
+    -------
+    str: the JSON string
+    """
+    if config.json_engine == "orjson" and _requires_json(value):
+        log.debug("Falling back to 'json' for encoding non-finite floats or enums")
+    elif config.json_engine == "orjson":
+        orjson = _import_engine("orjson")
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if indent is not None:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(value, default=_znjson_default, option=option).decode()
+        except orjson.JSONEncodeError as err:
+            # e.g. integers exceeding 64 bit are only supported by 'json'
+            log.debug(f"Falling back to 'json' for encoding: {err}")
+    else:
+        _import_engine(config.json_engine)
+    if indent is None:
+        return json.dumps(value, cls=znjson.ZnEncoder, separators=(",", ":"))
+    return json.dumps(value, indent=indent, cls=znjson.ZnEncoder)
+
+
+def loads(text: typing.Union[str, bytes]):
+    """Deserialize a JSON string without the znjson.ZnDecoder
+
+    Parameters
+    ----------
+    text: str|bytes
+        The JSON string
+
+    Returns
+    -------
+    any: the deserialized data
+    """
+    if config.json_engine == "orjson":
+        orjson = _import_engine("orjson")
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # e.g. 'NaN' or 'Infinity' are only supported by 'json'
+            pass
+    elif config.json_engine == "msgspec":
+        msgspec = _import_engine("msgspec")
+        try:
+            return msgspec.json.decode(text)
+        except msgspec.DecodeError:
+            pass
+    else:
+        _import_engine(config.json_engine)
+    return json.loads(text)
@@ -1,7 +1,6 @@
 """ZnTrack utils"""
 
 import contextlib
-import json
 import logging
 import os
 import pathlib
@@ -9,6 +8,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 
 import znjson
 
@@ -65,14 +65,145 @@ def deprecated(reason, version="v0.0.0"):
     return decorator
 
 
+def _encode_key(key) -> str:
+    """Convert a dict key to str the same way as 'json.dumps'"""
+    if isinstance(key, str):
+        return str(key)
+    if isinstance(key, float):
+        if key != key:  # pylint: disable=comparison-with-itself
+            return "NaN"
+        if key in (float("inf"), float("-inf")):
+            return "Infinity" if key > 0 else "-Infinity"
+        return float.__repr__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(
+        f"keys must be str, int, float, bool or None, not {key.__class__.__name__}"
+    )
+
+
+# types that are returned unchanged by 'json.loads(json.dumps(...))'
+_JSON_SCALARS = frozenset([str, int, float, bool, type(None)])
+
+
+class _ThreadConverters(threading.local):
+    """Additional znjson converters of the current thread"""
+
+    def __init__(self):
+        super().__init__()
+        self.converters = []
+
+
+_THREAD_CONVERTERS = _ThreadConverters()
+
+
+@contextlib.contextmanager
+def thread_converters(converters: list):
+    """Use additional znjson converters in 'encode_dict' / 'decode_dict'
+
+    Unlike 'znjson.config.register', this only affects the current thread, so
+    Nodes running in other threads are not affected.
+
+    Parameters
+    ----------
+    converters: list[znjson.ConverterBase]
+        The converters to use in addition to the registered ones. Converters with
+        a higher level take precedence.
+    """
+    previous = _THREAD_CONVERTERS.converters
+    _THREAD_CONVERTERS.converters = previous + list(converters)
+    try:
+        yield
+    finally:
+        _THREAD_CONVERTERS.converters = previous
+
+
+class _TreeCodec:
+    """Apply the registered znjson converters directly on a tree of python objects
+
+    The result is identical to 'json.loads(json.dumps(value, cls=znjson.ZnEncoder))'
+    (optionally with 'cls=znjson.ZnDecoder') but no intermediate string is created.
+
+    Parameters
+    ----------
+    decode: bool
+        Additionally apply the 'znjson.ZnDecoder' to every dict, bottom-up.
+    """
+
+    def __init__(self, decode: bool):
+        self.decode = decode
+        # sorting the converters is expensive, so resolve them only once per call
+        converters = znjson.ZnEncoder().active_converters
+        if _THREAD_CONVERTERS.converters:
+            converters = {*converters, *_THREAD_CONVERTERS.converters}
+            self.converters = sorted((x() for x in converters), reverse=True)
+        else:
+            self.converters = [converter() for converter in converters]
+        self.markers = set()
+
+    def __call__(self, obj):
+        if type(obj) in _JSON_SCALARS:
+            return obj
+        marker = id(obj)
+        if marker in self.markers:
+            raise ValueError("Circular reference detected")
+        self.markers.add(marker)
+        try:
+            return self._convert(obj)
+        finally:
+            self.markers.discard(marker)
+
+    def _convert(self, obj):
+        """Convert containers and objects that are not a 'json' scalar"""
+        # same order of isinstance checks as in 'json.encoder'
+        if obj is None or obj is True or obj is False:
+            return obj
+        if isinstance(obj, str):
+            return str(obj)
+        if isinstance(obj, int):
+            return int(obj)
+        if isinstance(obj, float):
+            return float(obj)
+        if isinstance(obj, (list, tuple)):
+            return [
+                value if type(value) in _JSON_SCALARS else self(value) for value in obj
+            ]
+        if isinstance(obj, dict):
+            result = {}
+            for key, value in obj.items():
+                if type(key) is not str:
+                    key = _encode_key(key)
+                result[key] = value if type(value) in _JSON_SCALARS else self(value)
+            return self._object_hook(result) if self.decode else result
+        for converter in self.converters:
+            if converter == obj:
+                return self(converter.encode_obj(obj))
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _object_hook(self, obj: dict):
+        """Decode the given dict like 'znjson.ZnDecoder'"""
+        if "_type" not in obj or "value" not in obj:
+            return obj
+        for converter in self.converters:
+            if converter.representation == obj["_type"]:
+                return converter.decode_obj(obj)
+        raise TypeError(f"Object of type {obj['_type']} could not be converted")
+
+
 def decode_dict(value):
     """Decode dict that was loaded without znjson"""
-    return json.loads(json.dumps(value), cls=znjson.ZnDecoder)
+    return _TreeCodec(decode=True)(value)
 
 
 def encode_dict(value) -> dict:
     """Encode value into a dict serialized with ZnJson"""
-    return json.loads(json.dumps(value, cls=znjson.ZnEncoder))
+    return _TreeCodec(decode=False)(value)
 
 
 def module_handler(obj) -> str:
@@ -8,9 +8,11 @@ see https://dvc.org/doc/command-reference/run#options
 
 import contextlib
 import logging
+import pathlib
 
 from zntrack import utils
 from zntrack.core.zntrackoption import ZnTrackOption
+from zntrack.zn import formats
 from zntrack.zn.method import Method
 from zntrack.zn.nodes import Nodes
 from zntrack.zn.split_option import SplitZnTrackOption
@@ -25,6 +27,11 @@ with contextlib.suppress(ImportError):
 
     __all__ += [plots.__name__]
 
+with contextlib.suppress(ImportError):
+    from .arrays import arrays
+
+    __all__ += [arrays.__name__]
+
 
 class outs(ZnTrackOption):  # pylint: disable=invalid-name
     """Identify DVC option
@@ -35,6 +42,60 @@ class outs(ZnTrackOption):  # pylint: disable=invalid-name
 
     zn_type = utils.ZnTypes.RESULTS
 
+    def __init__(
+        self, *args, format: str = "json", **kwargs  # pylint: disable=redefined-builtin
+    ):
+        """Parse additional attributes for outs
+
+        Parameters
+        ----------
+        format: str, default = "json"
+            The file format to store the value in. With "json" all zn.outs of
+            the Node are serialized into 'nodes/<node_name>/outs.json'.
+            Other formats store the value in 'nodes/<node_name>/<name>.<format>',
+            e.g. "npy" for numpy arrays which are loaded memory-mapped.
+            "lazy" stores large dicts / lists to only load the accessed entries.
+            "auto" selects a binary format for large values and json otherwise.
+            "pickle" stores arbitrary objects, but loading a pickle can execute
+            arbitrary code and must be selected explicitly.
+            See 'zntrack.zn.formats' for all available formats.
+        """
+        self.format = None if format == "json" else formats.get_format(format)
+        if self.format is not None and kwargs.get("compression") is not None:
+            raise ValueError(
+                f"zn.outs(format='{format}') can not be combined with compression."
+            )
+        super().__init__(*args, **kwargs)
+
+    def get_filename(self, instance) -> pathlib.Path:
+        """Use a dedicated file if a format other than json is used"""
+        if self.format is None:
+            return super().get_filename(instance)
+        return pathlib.Path(
+            "nodes", instance.node_name, f"{self.name}{self.format.suffix}"
+        )
+
+    def save(self, instance):
+        """Save the value with the selected format"""
+        if self.format is None:
+            return super().save(instance)
+        if instance.__dict__.get(self.name) is utils.LazyOption:
+            # do not save anything if __get__/__set__ was never used
+            return
+        value = self.__get__(instance, self.owner)
+        file = self.get_filename(instance)
+        file.parent.mkdir(exist_ok=True, parents=True)
+        self.format.save(file, value)
+
+    def get_data_from_files(self, instance):
+        """Load the value with the selected format"""
+        if self.format is None:
+            return super().get_data_from_files(instance)
+        try:
+            return self.format.load(self.get_filename(instance))
+        except FileNotFoundError as err:
+            raise self._get_loading_errors(instance) from err
+
 
 class deps(ZnTrackOption):  # pylint: disable=invalid-name
     """Identify DVC option
@@ -79,6 +140,42 @@ class metrics(ZnTrackOption):  # pylint: disable=invalid-name
             self.dvc_option = utils.DVCOptions.METRICS.value
         super().__init__(*args, **kwargs)
 
+    def update(self, instance, values: dict):
+        """Merge the values into the metrics and write them to file immediately
+
+        Only the metrics file, e.g. 'nodes/<node_name>/metrics_no_cache.json', is
+        replaced atomically. The update is neither flushed to disk with fsync nor
+        added to the 'config.content_store', which both happen when the Node is saved.
+        A json file can not be updated in place. So the whole file, which can also
+        hold other zn.metrics of the Node, is re-read, parsed and serialized under
+        its file lock on every update. The cost grows with the size of the metrics.
+
+        Parameters
+        ----------
+        instance: Node
+            instance where the Descriptor is attached to.
+        values: dict
+            The metrics to add or replace.
+        """
+        metrics = instance.__dict__.get(self.name)
+        if not isinstance(metrics, dict):
+            # e.g. LazyOption or a value that is not a dict
+            metrics = {}
+        metrics.update(values)
+        instance.__dict__[self.name] = metrics
+
+        file = self.get_filename(instance)
+        file.parent.mkdir(exist_ok=True, parents=True)
+        utils.file_io.update_config_file(
+            file=file,
+            node_name=None,
+            value_name=self.name,
+            value=metrics,
+            compact=self.is_compact(instance),
+            fsync=False,
+            store=False,
+        )
+
 
 class params(SplitZnTrackOption):  # pylint: disable=invalid-name
     """Identify DVC option
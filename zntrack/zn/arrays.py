@@ -0,0 +1,268 @@
+"""Description: zn.arrays for numpy arrays that do not fit into memory
+
+The rows of the array are stored along the first axis in fixed-size chunk files
+'nodes/<node_name>/<name>.arrays/chunk_<n>.npy' next to a small 'manifest.json'.
+The directory is a single DVC output.
+"""
+import concurrent.futures
+import pathlib
+import typing
+
+import numpy as np
+
+from zntrack import utils
+from zntrack.core.zntrackoption import ZnTrackOption
+
+
+class ChunkedArray:
+    """Array that is stored in chunks of rows
+
+    While running a Node, rows can be added via 'append' / 'extend' and only the
+    last incomplete chunk is kept in memory. A loaded ChunkedArray is read-only
+    and only reads the chunks that are accessed, e.g. 'array[100:200]'.
+
+    Attributes
+    ----------
+    directory: pathlib.Path
+        The directory containing the manifest and the chunks.
+    chunk_size: int
+        The number of rows per chunk file.
+    writable: bool
+        Allow 'append' and 'extend'.
+    """
+
+    def __init__(self, directory: pathlib.Path, chunk_size: int, writable: bool = True):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.writable = writable
+        self.dtype: typing.Optional[np.dtype] = None
+        self.row_shape: typing.Optional[tuple] = None
+        self._n_rows = 0
+        self._n_full_chunks = 0
+        self._buffer: typing.List[np.ndarray] = []
+        self._buffered_rows = 0
+        # a new array must always replace the files of a previous run
+        self._flushed = not writable
+
+    @classmethod
+    def open(cls, directory: pathlib.Path) -> "ChunkedArray":
+        """Open an existing ChunkedArray read-only"""
+        manifest = utils.file_io.read_file(directory / "manifest.json")
+        array = cls(directory, chunk_size=manifest["chunk_size"], writable=False)
+        array._n_rows = manifest["shape"][0]
+        if manifest["dtype"] is not None:
+            array.dtype = np.dtype(manifest["dtype"])
+            array.row_shape = tuple(manifest["shape"][1:])
+        return array
+
+    @property
+    def shape(self) -> tuple:
+        """The shape of the full array"""
+        return (self._n_rows,) + (self.row_shape or ())
+
+    @property
+    def n_chunks(self) -> int:
+        """The number of chunk files"""
+        return -(-self._n_rows // self.chunk_size)
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(shape={self.shape}, dtype={self.dtype})"
+
+    def __array__(self, dtype=None):
+        array = self.to_numpy()
+        return array if dtype is None else array.astype(dtype)
+
+    def get_chunk_file(self, idx: int) -> pathlib.Path:
+        """Get the file of the chunk with the given index"""
+        return self.directory / f"chunk_{idx}.npy"
+
+    def append(self, row):
+        """Append a single row"""
+        self.extend(np.asarray(row)[np.newaxis])
+
+    def extend(self, rows):
+        """Append multiple rows along the first axis
+
+        Raises
+        ------
+        ValueError: if the shape or dtype of the rows does not match the first rows
+        """
+        if not self.writable:
+            raise ValueError(f"Can not extend the read-only {self!r}")
+        rows = np.asarray(rows)
+        if self.dtype is None:
+            if rows.dtype.hasobject:
+                raise TypeError("zn.arrays does not support object arrays")
+            self.dtype, self.row_shape = rows.dtype, rows.shape[1:]
+        if rows.shape[1:] != self.row_shape:
+            raise ValueError(
+                f"Can not add rows of shape {rows.shape[1:]} to rows of shape"
+                f" {self.row_shape}"
+            )
+        if not np.can_cast(rows.dtype, self.dtype, casting="same_kind"):
+            raise ValueError(f"Can not add rows of dtype {rows.dtype} to {self.dtype}")
+        self._buffer.append(rows.astype(self.dtype, copy=False))
+        self._buffered_rows += len(rows)
+        self._n_rows += len(rows)
+        self._flushed = False
+        if self._buffered_rows >= self.chunk_size:
+            buffer = np.concatenate(self._buffer)
+            while len(buffer) >= self.chunk_size:
+                self._write_chunk(buffer[: self.chunk_size])
+                self._n_full_chunks += 1
+                buffer = buffer[self.chunk_size :]
+            self._buffer, self._buffered_rows = [buffer], len(buffer)
+
+    def _write_chunk(self, rows: np.ndarray):
+        """Write the rows to the chunk after the last full chunk"""
+        self.directory.mkdir(exist_ok=True, parents=True)
+        file = self.get_chunk_file(self._n_full_chunks)
+        with utils.file_io.atomic_open(file, "wb") as handle:
+            np.save(handle, rows, allow_pickle=False)
+
+    def flush(self):
+        """Write the incomplete chunk and the manifest
+
+        The first flush removes the chunks of a previous run.
+        """
+        if self._flushed and (self.directory / "manifest.json").exists():
+            return
+        if self._buffered_rows > 0:
+            buffer = np.concatenate(self._buffer)
+            self._write_chunk(buffer)
+            self._buffer = [buffer]
+        self.directory.mkdir(exist_ok=True, parents=True)
+        for file in self.directory.glob("chunk_*.npy"):
+            if int(file.stem.split("_")[1]) >= self.n_chunks:
+                file.unlink()
+        manifest = {
+            "dtype": None if self.dtype is None else self.dtype.str,
+            "shape": list(self.shape),
+            "chunk_size": self.chunk_size,
+        }
+        utils.file_io.write_file(self.directory / "manifest.json", manifest)
+        self._flushed = True
+
+    def read_chunk(self, idx: int) -> np.ndarray:
+        """Load the chunk with the given index as read-only memory-mapped array"""
+        if not self._flushed:
+            self.flush()
+        return np.load(self.get_chunk_file(idx), mmap_mode="r", allow_pickle=False)
+
+    def iter_chunks(self) -> typing.Iterator[np.ndarray]:
+        """Iterate over all chunks without loading the full array into memory"""
+        for idx in range(self.n_chunks):
+            yield self.read_chunk(idx)
+
+    def _read_rows(self, start: int, stop: int) -> np.ndarray:
+        """Read the rows [start, stop) from the chunks that contain them"""
+        parts = []
+        for idx in range(start // self.chunk_size, -(-stop // self.chunk_size)):
+            offset = idx * self.chunk_size
+            chunk = self.read_chunk(idx)
+            parts.append(chunk[max(start - offset, 0) : stop - offset])
+        if not parts:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)
+        return np.concatenate(parts)
+
+    def __getitem__(self, item):
+        if isinstance(item, tuple):
+            rows = self[item[0]]
+            if isinstance(item[0], slice):
+                return rows[(slice(None),) + item[1:]]
+            return rows[item[1:]]
+        if isinstance(item, slice):
+            indices = range(*item.indices(self._n_rows))
+            if len(indices) == 0:
+                return self._read_rows(0, 0)
+            start, stop = min(indices), max(indices) + 1
+            return self._read_rows(start, stop)[np.asarray(indices) - start]
+        if item < 0:
+            item += self._n_rows
+        if not 0 <= item < self._n_rows:
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        return np.array(self.read_chunk(item // self.chunk_size)[item % self.chunk_size])
+
+    def to_numpy(self, max_workers: int = None) -> np.ndarray:
+        """Load the full array, reading the chunks in parallel
+
+        Parameters
+        ----------
+        max_workers: int, optional
+            The number of threads to read the chunks with,
+            see 'concurrent.futures.ThreadPoolExecutor'.
+        """
+        array = np.empty(self.shape, dtype=self.dtype)
+
+        def read(idx: int):
+            offset = idx * self.chunk_size
+            array[offset : offset + self.chunk_size] = self.read_chunk(idx)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(read, range(self.n_chunks)))
+        return array
+
+
+class arrays(ZnTrackOption):  # pylint: disable=invalid-name
+    """Store a numpy array in chunks that are written during the run
+
+    While running the Node, the attribute is a writable 'ChunkedArray', e.g.
+    'self.positions.append(row)'. Assigning a np.ndarray is also supported.
+    Loading the Node returns a read-only 'ChunkedArray'.
+    """
+
+    dvc_option = utils.DVCOptions.OUTS.value
+    zn_type = utils.ZnTypes.RESULTS
+
+    def __init__(self, *args, chunk_size: int = 1024, **kwargs):
+        """Parse additional attributes for arrays
+
+        Parameters
+        ----------
+        chunk_size: int, default = 1024
+            The number of rows per chunk file. Only the last incomplete chunk
+            is kept in memory during the run.
+        """
+        self.chunk_size = chunk_size
+        super().__init__(*args, **kwargs)
+
+    def __get__(self, instance, owner=None):
+        """Provide a ChunkedArray when running a Node that is not loaded"""
+        if (
+            instance is not None
+            and not instance.is_loaded
+            and self.name not in instance.__dict__
+        ):
+            self.prepare_run(instance)
+        return super().__get__(instance, owner)
+
+    def prepare_run(self, instance):
+        """Start a new ChunkedArray before the run"""
+        instance.__dict__[self.name] = ChunkedArray(
+            self.get_filename(instance), chunk_size=self.chunk_size
+        )
+
+    def get_filename(self, instance) -> pathlib.Path:
+        """The directory of the chunks"""
+        return pathlib.Path("nodes", instance.node_name, f"{self.name}.arrays")
+
+    def save(self, instance):
+        """Write the incomplete chunk and the manifest"""
+        value = self.__get__(instance, self.owner)
+        if isinstance(value, ChunkedArray):
+            if value.writable:
+                value.flush()
+            return
+        array = ChunkedArray(self.get_filename(instance), chunk_size=self.chunk_size)
+        array.extend(value)
+        array.flush()
+
+    def get_data_from_files(self, instance) -> ChunkedArray:
+        """Open the ChunkedArray read-only"""
+        try:
+            return ChunkedArray.open(self.get_filename(instance))
+        except FileNotFoundError as err:
+            raise self._get_loading_errors(instance) from err
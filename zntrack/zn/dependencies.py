@@ -87,11 +87,9 @@ def get_origin(
     ------
     AttributeError: if the attribute is not of type zn.deps
     """
-    znjson.config.register(RawNodeAttributeConverter)
-    new_node = node.load(name=node.node_name)
-    value = getattr(new_node, attribute)
-
-    znjson.config.deregister(RawNodeAttributeConverter)
+    with utils.thread_converters([RawNodeAttributeConverter]):
+        new_node = node.load(name=node.node_name)
+        value = getattr(new_node, attribute)
 
     def not_zn_deps_err() -> AttributeError:
         """Evaluate error message when raising the error"""
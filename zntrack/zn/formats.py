@@ -0,0 +1,433 @@
+"""Description: Binary storage formats for zn.outs
+
+By default, all 'zn.outs' of a Node are serialized with znjson into
+'nodes/<node_name>/outs.json'. This is not feasible for large numeric data.
+A 'StorageFormat' stores the value of a single 'zn.outs(format=<name>)' in its own
+file 'nodes/<node_name>/<attribute><suffix>' instead.
+
+Formats
+-------
+npy:
+    A single numpy array. It is loaded as a read-only memory-mapped array,
+    so only the parts that are accessed are read from disk.
+npz:
+    A dictionary of {str: numpy array}. Arrays in npz archives can not be
+    memory-mapped and are loaded into memory.
+pickle:
+    Any picklable object, using pickle protocol 5. Large buffers that support
+    out-of-band pickling, e.g. numpy arrays, are written without copies to separate
+    raw files and are loaded memory-mapped. Loading a pickle can execute arbitrary
+    code, so only load Nodes from sources you trust. This format is never selected
+    automatically.
+lazy:
+    A dict with str keys or a list. Every dict entry / chunk of list items is stored
+    in its own json file. The value is loaded as a read-only 'LazyDict' /
+    'LazyList' that only reads the entries / chunks that are accessed.
+parquet:
+    A pd.DataFrame, requires pyarrow.
+auto:
+    Select a format when saving, based on the type and size of the value. Values
+    larger than 'config.auto_format_threshold' bytes are stored as "npy" (numpy
+    arrays), "npz" (dicts of numpy arrays) or "parquet" (pd.DataFrame, if pyarrow
+    is available). All other values are stored as json. The selected format is
+    recorded, so loading does not need to guess it.
+"""
+import abc
+import collections.abc
+import importlib.util
+import mmap
+import pathlib
+import pickle
+import typing
+
+import pandas as pd
+
+from zntrack import utils
+
+
+def _import_numpy():
+    """Import numpy, which is only required for the numpy based formats"""
+    try:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "The 'npy' and 'npz' formats require numpy. Install it via 'pip install"
+            " numpy'."
+        ) from err
+    return np
+
+
+class StorageFormat(abc.ABC):
+    """Base class to store the value of a zn.outs in a dedicated file
+
+    Attributes
+    ----------
+    name: str
+        The name to select the format, as in zn.outs(format=<name>)
+    suffix: str
+        The suffix of the file, e.g. '.npy'
+    """
+
+    name: str
+    suffix: str
+
+    @abc.abstractmethod
+    def save(self, file: pathlib.Path, value):
+        """Write the value to the file"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load(self, file: pathlib.Path):
+        """Read the value from the file"""
+        raise NotImplementedError
+
+
+class NumpyFormat(StorageFormat):
+    """Store a numpy array in a '.npy' file which is loaded memory-mapped"""
+
+    name = "npy"
+    suffix = ".npy"
+
+    def save(self, file: pathlib.Path, value):
+        """Save the array with np.save"""
+        np = _import_numpy()
+        if not isinstance(value, np.ndarray):
+            raise TypeError(
+                f"zn.outs(format='npy') only supports <np.ndarray> and not {type(value)}"
+            )
+        if value.dtype.hasobject:
+            raise TypeError("zn.outs(format='npy') does not support object arrays")
+        with utils.file_io.atomic_open(file, "wb") as handle:
+            np.save(handle, value, allow_pickle=False)
+
+    def load(self, file: pathlib.Path):
+        """Load the array as a read-only np.memmap"""
+        np = _import_numpy()
+        return np.load(file, mmap_mode="r", allow_pickle=False)
+
+
+class NumpyArchiveFormat(StorageFormat):
+    """Store a dictionary of numpy arrays in a '.npz' file"""
+
+    name = "npz"
+    suffix = ".npz"
+
+    def save(self, file: pathlib.Path, value):
+        """Save the arrays with np.savez"""
+        np = _import_numpy()
+        if not isinstance(value, dict):
+            raise TypeError(
+                "zn.outs(format='npz') only supports <dict> of <np.ndarray> and not"
+                f" {type(value)}"
+            )
+        with utils.file_io.atomic_open(file, "wb") as handle:
+            np.savez(handle, **value)
+
+    def load(self, file: pathlib.Path) -> dict:
+        """Load all arrays into a dictionary"""
+        np = _import_numpy()
+        with np.load(file, allow_pickle=False) as archive:
+            return dict(archive)
+
+
+class PickleFormat(StorageFormat):
+    """Store any object with pickle protocol 5 and out-of-band buffers
+
+    The value is stored in the directory 'nodes/<node_name>/<name>.pickle' which
+    contains the pickle stream 'data.pkl' and one raw file 'buffer_<n>.bin' per
+    out-of-band buffer.
+
+    Attributes
+    ----------
+    buffer_threshold: int
+        Buffers smaller than this number of bytes are stored inside the pickle stream.
+    """
+
+    name = "pickle"
+    suffix = ".pickle"
+    buffer_threshold = 2**16
+
+    def save(self, file: pathlib.Path, value):
+        """Pickle the value and write large buffers to raw files"""
+        file.mkdir(exist_ok=True, parents=True)
+        buffers = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer):
+            try:
+                raw = buffer.raw()
+            except BufferError:
+                return True  # non-contiguous buffers are pickled in-band
+            if raw.nbytes == 0 or raw.nbytes < self.buffer_threshold:
+                return True
+            with utils.file_io.atomic_open(
+                file / f"buffer_{len(buffers)}.bin", "wb"
+            ) as handle:
+                handle.write(raw)
+            buffers.append(raw.nbytes)
+            return False
+
+        data = pickle.dumps(value, protocol=5, buffer_callback=buffer_callback)
+        with utils.file_io.atomic_open(file / "data.pkl", "wb") as handle:
+            handle.write(data)
+        for buffer_file in file.glob("buffer_*.bin"):
+            if int(buffer_file.stem.split("_")[1]) >= len(buffers):
+                buffer_file.unlink()
+
+    def load(self, file: pathlib.Path):
+        """Unpickle the value with memory-mapped buffers"""
+        buffers = []
+        for idx in range(len(list(file.glob("buffer_*.bin")))):
+            with open(file / f"buffer_{idx}.bin", "rb") as handle:
+                buffers.append(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+        with open(file / "data.pkl", "rb") as handle:
+            return pickle.load(handle, buffers=buffers)
+
+
+def _read_entry(file: pathlib.Path):
+    """Read and decode a single file written by 'LazyFormat'"""
+    return utils.decode_dict(utils.file_io.read_file(file))["value"]
+
+
+class LazyDict(collections.abc.Mapping):
+    """Read-only dict that loads the value of every key on first access"""
+
+    def __init__(self, directory: pathlib.Path, keys: typing.List[str]):
+        self._directory = directory
+        self._files = {key: idx for idx, key in enumerate(keys)}
+        self._values = {}
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            file = self._directory / f"{self._files[key]}.json"
+            self._values[key] = _read_entry(file)
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(keys={list(self._files)})"
+
+
+class LazyList(collections.abc.Sequence):
+    """Read-only list that loads the chunk of an item on first access"""
+
+    def __init__(self, directory: pathlib.Path, length: int, chunk_size: int):
+        self._directory = directory
+        self._length = length
+        self._chunk_size = chunk_size
+        self._chunks = {}
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[idx] for idx in range(*item.indices(self._length))]
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        chunk, idx = divmod(item, self._chunk_size)
+        if chunk not in self._chunks:
+            self._chunks[chunk] = _read_entry(self._directory / f"{chunk}.json")
+        return self._chunks[chunk][idx]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, LazyList)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(length={self._length})"
+
+
+class LazyFormat(StorageFormat):
+    """Store a dict per key or a list per chunk to load them lazily
+
+    The value is stored in the directory 'nodes/<node_name>/<name>.lazy' which
+    contains 'manifest.json' and the entries / chunks '<n>.json'.
+
+    Attributes
+    ----------
+    chunk_size: int
+        The number of list items that are stored in a single file.
+    """
+
+    name = "lazy"
+    suffix = ".lazy"
+    chunk_size = 1000
+
+    def save(self, file: pathlib.Path, value):
+        """Write every entry / chunk and the manifest"""
+        if isinstance(value, dict):
+            if not all(isinstance(key, str) for key in value):
+                raise TypeError(
+                    "zn.outs(format='lazy') only supports <dict> with str keys"
+                )
+            manifest = {"type": "dict", "keys": list(value)}
+            entries = list(value.values())
+        elif isinstance(value, list):
+            manifest = {
+                "type": "list",
+                "length": len(value),
+                "chunk_size": self.chunk_size,
+            }
+            entries = [
+                value[idx : idx + self.chunk_size]
+                for idx in range(0, len(value), self.chunk_size)
+            ]
+        else:
+            raise TypeError(
+                "zn.outs(format='lazy') only supports <dict> or <list> and not"
+                f" {type(value)}"
+            )
+        file.mkdir(exist_ok=True, parents=True)
+        for idx, entry in enumerate(entries):
+            utils.file_io.write_file(
+                file / f"{idx}.json", utils.encode_dict({"value": entry})
+            )
+        utils.file_io.write_file(file / "manifest.json", manifest)
+        for entry_file in file.glob("*.json"):
+            if entry_file.stem.isdigit() and int(entry_file.stem) >= len(entries):
+                entry_file.unlink()
+
+    def load(self, file: pathlib.Path) -> typing.Union[LazyDict, LazyList]:
+        """Read the manifest and return a LazyDict / LazyList"""
+        manifest = utils.file_io.read_file(file / "manifest.json")
+        if manifest["type"] == "dict":
+            return LazyDict(file, keys=manifest["keys"])
+        return LazyList(
+            file, length=manifest["length"], chunk_size=manifest["chunk_size"]
+        )
+
+
+class ParquetFormat(StorageFormat):
+    """Store a pd.DataFrame in a '.parquet' file"""
+
+    name = "parquet"
+    suffix = ".parquet"
+
+    @staticmethod
+    def _import_pyarrow():
+        """Import pyarrow, which is only required for this format"""
+        try:
+            # pylint: disable=import-outside-toplevel
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as err:
+            raise ImportError(
+                "The 'parquet' format requires pyarrow. Install it via 'pip install"
+                " pyarrow'."
+            ) from err
+        return pyarrow
+
+    def save(self, file: pathlib.Path, value):
+        """Save the DataFrame including its index"""
+        pyarrow = self._import_pyarrow()
+        if not isinstance(value, pd.DataFrame):
+            raise TypeError(
+                "zn.outs(format='parquet') only supports <pd.DataFrame> and not"
+                f" {type(value)}"
+            )
+        table = pyarrow.Table.from_pandas(value, preserve_index=True)
+        with utils.file_io.atomic_open(file, "wb") as handle:
+            pyarrow.parquet.write_table(table, handle)
+
+    def load(self, file: pathlib.Path) -> pd.DataFrame:
+        """Load the DataFrame"""
+        return self._import_pyarrow().parquet.read_table(file).to_pandas()
+
+
+class AutoFormat(StorageFormat):
+    """Select the format based on the value when saving
+
+    The value is stored in the directory 'nodes/<node_name>/<name>.auto' which
+    contains 'format.json' with the name of the selected format and the data file
+    'data<suffix>', e.g. 'data.npy' or 'data.json'.
+    """
+
+    name = "auto"
+    suffix = ".auto"
+
+    @staticmethod
+    def select(value) -> typing.Optional[StorageFormat]:
+        """Get the format for the given value or None for json"""
+        threshold = utils.config.auto_format_threshold
+        if isinstance(value, pd.DataFrame):
+            if (
+                importlib.util.find_spec("pyarrow") is not None
+                and value.memory_usage(deep=True).sum() >= threshold
+            ):
+                return FORMATS["parquet"]
+            return None
+        np = _import_numpy()
+
+        def is_numeric(array) -> bool:
+            return isinstance(array, np.ndarray) and not array.dtype.hasobject
+
+        if is_numeric(value) and value.nbytes >= threshold:
+            return FORMATS["npy"]
+        if (
+            isinstance(value, dict)
+            and value
+            and all(isinstance(key, str) and is_numeric(x) for key, x in value.items())
+            and sum(x.nbytes for x in value.values()) >= threshold
+        ):
+            return FORMATS["npz"]
+        return None
+
+    def save(self, file: pathlib.Path, value):
+        """Save the value in the selected format and record the format"""
+        storage_format = self.select(value)
+        file.mkdir(exist_ok=True, parents=True)
+        if storage_format is None:
+            data_file = file / "data.json"
+            utils.file_io.write_file(data_file, utils.encode_dict(value))
+        else:
+            data_file = file / f"data{storage_format.suffix}"
+            storage_format.save(data_file, value)
+        name = "json" if storage_format is None else storage_format.name
+        utils.file_io.write_file(file / "format.json", {"format": name})
+        for outdated in file.glob("data.*"):
+            if outdated != data_file:
+                outdated.unlink()
+
+    def load(self, file: pathlib.Path):
+        """Load the value with the recorded format"""
+        name = utils.file_io.read_file(file / "format.json")["format"]
+        if name == "json":
+            return utils.decode_dict(utils.file_io.read_file(file / "data.json"))
+        storage_format = FORMATS[name]
+        return storage_format.load(file / f"data{storage_format.suffix}")
+
+
+FORMATS: typing.Dict[str, StorageFormat] = {
+    storage_format.name: storage_format
+    for storage_format in [
+        NumpyFormat(),
+        NumpyArchiveFormat(),
+        PickleFormat(),
+        LazyFormat(),
+        ParquetFormat(),
+        AutoFormat(),
+    ]
+}
+
+
+def get_format(name: str) -> StorageFormat:
+    """Get the StorageFormat with the given name
+
+    Raises
+    ------
+    ValueError: if the format does not exist
+    """
+    try:
+        return FORMATS[name]
+    except KeyError as err:
+        raise ValueError(
+            f"Format '{name}' is not supported. Use 'json' or one of {list(FORMATS)}."
+        ) from err
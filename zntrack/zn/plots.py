@@ -1,5 +1,8 @@
+import csv
 import logging
 import pathlib
+import time
+import typing
 
 import pandas as pd
 
@@ -8,12 +11,127 @@ from zntrack.dvc.custom_base import PlotsModifyOption
 
 log = logging.getLogger(__name__)
 
+FORMATS = ("csv", "parquet", "feather")
+VIEWS = ("csv", "json", None)
+# the name of an unnamed index, so that 'append=True' writes the same header
+INDEX_NAME = "index"
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only required for the columnar formats"""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as err:
+        raise ImportError(
+            "The 'parquet' and 'feather' formats of zn.plots require pyarrow. Install"
+            " it via 'pip install pyarrow'."
+        ) from err
+    return pyarrow
+
+
+class PlotsStream:
+    """Append rows to the csv file of a 'zn.plots(append=True)' during the run
+
+    Rows are buffered in memory and appended to the file when 'buffer_size' rows
+    are collected or 'flush_interval' seconds have passed since the last write.
+    Therefore, the cost per row is independent of the number of rows already
+    written. The file is written directly, not atomically.
+
+    Attributes
+    ----------
+    file: pathlib.Path
+        The csv file to write to. It is replaced with the first write.
+    columns: list[str]
+        The columns of the data, defined by the first row.
+    buffer_size: int
+        The maximal number of rows to keep in memory.
+    flush_interval: float
+        The maximal time in seconds to keep rows in memory, to allow for live output.
+    """
+
+    def __init__(
+        self, file: pathlib.Path, buffer_size: int = 1000, flush_interval: float = 5.0
+    ):
+        self.file = file
+        self.columns = None
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._size = 0
+        self._written = False
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        """The number of rows including the ones that are not yet written"""
+        return self._size
+
+    def append(self, row: dict = None, **kwargs):
+        """Append a single row, e.g. 'append({"loss": 0.1})' or 'append(loss=0.1)'
+
+        Raises
+        ------
+        ValueError: if the row contains a column that is not in the first row
+        """
+        row = {**(row or {}), **kwargs}
+        if self.columns is None:
+            self.columns = list(row)
+        elif not row.keys() <= set(self.columns):
+            raise ValueError(
+                f"Can not append columns {list(row.keys() - set(self.columns))} to"
+                f" {self.file}. Columns are fixed to {self.columns} by the first row."
+            )
+        self._buffer.append(row)
+        self._size += 1
+        if (
+            len(self._buffer) >= self.buffer_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Append all buffered rows to the file"""
+        self._last_flush = time.monotonic()
+        if self._written and not self._buffer:
+            return
+        mode = "a" if self._written else "w"
+        self.file.parent.mkdir(exist_ok=True, parents=True)
+        if not self._written:
+            # the file could be a read-only link to 'config.content_store'
+            self.file.unlink(missing_ok=True)
+        with self.file.open(mode, newline="") as handle:
+            writer = csv.writer(handle)
+            if not self._written:
+                writer.writerow([INDEX_NAME] + (self.columns or []))
+            start = self._size - len(self._buffer)
+            for index, row in enumerate(self._buffer, start=start):
+                writer.writerow([index] + [row.get(key) for key in self.columns])
+        self._buffer.clear()
+        # without any row, the header is incomplete and must be replaced later
+        self._written = self.columns is not None
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Flush and load all rows"""
+        self.flush()
+        return pd.read_csv(self.file, index_col=0)
+
 
 class plots(PlotsModifyOption):  # pylint: disable=invalid-name
     dvc_option = utils.DVCOptions.PLOTS.value
     zn_type = utils.ZnTypes.PLOTS
 
-    def __init__(self, *args, cache: bool = True, **kwargs):
+    def __init__(
+        self,
+        *args,
+        cache: bool = True,
+        format: str = "csv",  # pylint: disable=redefined-builtin
+        view: typing.Optional[str] = "csv",
+        append: bool = False,
+        **kwargs,
+    ):
         """Parse additional attributes for plots
 
         Parameters
@@ -21,32 +139,148 @@ class plots(PlotsModifyOption):  # pylint: disable=invalid-name
         cache: bool, default = True
             Store the result of 'zn.plots' inside the DVC cache. If False
             store the results as 'dvc plots-no-cache'.
+        format: str, default = "csv"
+            The file format to store the DataFrame in. "parquet" and "feather"
+            require pyarrow and store the data in 'nodes/<node_name>/<name>.<format>'.
+            Both keep the dtypes and allow loading selected columns only, see 'read'.
+        view: str, default = "csv"
+            Only used for "parquet" and "feather". Additionally write the data as
+            "csv" or "json" to 'nodes/<node_name>/<name>.<view>' to be used by
+            'dvc plots'. If None, no view is written and 'dvc plots' is not available.
+        append: bool, default = False
+            Write the data row by row during the run. The attribute is then a
+            'PlotsStream' and rows are added via e.g. 'self.plots.append(loss=0.1)'.
+            'Node.save_plots()' only writes the new rows. When loading the Node,
+            a pd.DataFrame is returned. Only supported for format="csv".
         """
+        if format not in FORMATS:
+            raise ValueError(f"zn.plots(format='{format}') must be one of {FORMATS}")
+        if view not in VIEWS:
+            raise ValueError(f"zn.plots(view='{view}') must be one of {VIEWS}")
+        if append and format != "csv":
+            raise ValueError("zn.plots(append=True) is only supported for format='csv'")
         if not cache:
             self.dvc_option = utils.DVCOptions.PLOTS_NO_CACHE.value
+        self.cache = cache
+        self.format = format
+        self.view = "csv" if format == "csv" else view
+        self.append = append
         super().__init__(*args, **kwargs)
 
+    def __get__(self, instance, owner=None):
+        """Provide a PlotsStream when running a Node that is not loaded"""
+        if (
+            instance is not None
+            and self.append
+            and not instance.is_loaded
+            and self.name not in instance.__dict__
+        ):
+            self.prepare_run(instance)
+        return super().__get__(instance, owner)
+
+    def prepare_run(self, instance):
+        """Start a new PlotsStream before the run"""
+        if self.append:
+            instance.__dict__[self.name] = PlotsStream(self.get_filename(instance))
+
     def get_filename(self, instance) -> pathlib.Path:
-        """Overwrite filename to csv"""
-        return pathlib.Path("nodes", instance.node_name, f"{self.name}.csv")
+        """Overwrite filename to the file used by 'dvc plots', e.g. csv"""
+        suffix = self.format if self.view is None else self.view
+        return pathlib.Path("nodes", instance.node_name, f"{self.name}.{suffix}")
+
+    def get_data_file(self, instance) -> pathlib.Path:
+        """Get the file the data is loaded from"""
+        return pathlib.Path("nodes", instance.node_name, f"{self.name}.{self.format}")
+
+    def get_dvc_outputs(self, instance) -> typing.List[typing.Tuple[str, pathlib.Path]]:
+        """Track the columnar file as outs and the view as plots"""
+        if self.format == "csv":
+            return super().get_dvc_outputs(instance)
+        outs_option = (
+            utils.DVCOptions.OUTS if self.cache else utils.DVCOptions.OUTS_NO_CACHE
+        )
+        outputs = [(outs_option.value.replace("_", "-"), self.get_data_file(instance))]
+        if self.view is not None:
+            outputs.append((self.dvc_args, self.get_filename(instance)))
+        return outputs
+
+    def post_dvc_cmd(self, instance) -> typing.List[str]:
+        """Only run plots modify if a file for 'dvc plots' is available"""
+        if self.view is None:
+            return None
+        return super().post_dvc_cmd(instance)
 
     def save(self, instance):
-        """Save value with pd.DataFrame.to_csv"""
+        """Save value with pd.DataFrame.to_csv or pyarrow"""
         value = self.__get__(instance, self.owner)
 
+        if isinstance(value, PlotsStream):
+            value.flush()
+            return
+
         if not isinstance(value, pd.DataFrame):
             raise TypeError(
                 f"zn.plots() only supports <pd.DataFrame> and not {type(value)}"
             )
 
         if value.index.name is None:
-            value.index.name = "index"
+            value.index.name = INDEX_NAME
 
         file = self.get_filename(instance)
         file.parent.mkdir(exist_ok=True, parents=True)
-        value.to_csv(file)
+        if self.format != "csv":
+            pyarrow = _import_pyarrow()
+            table = pyarrow.Table.from_pandas(value, preserve_index=True)
+            with utils.file_io.atomic_open(self.get_data_file(instance), "wb") as handle:
+                if self.format == "parquet":
+                    pyarrow.parquet.write_table(table, handle)
+                else:
+                    pyarrow.feather.write_feather(table, handle)
+        if self.view == "csv":
+            with utils.file_io.atomic_open(file, newline="") as handle:
+                value.to_csv(handle)
+        elif self.view == "json":
+            with utils.file_io.atomic_open(file) as handle:
+                value.reset_index().to_json(handle, orient="records")
 
     def get_data_from_files(self, instance):
-        """Load value with pd.read_csv"""
-        file = self.get_filename(instance)
-        return pd.read_csv(file, index_col=0)
+        """Load value with pd.read_csv or pyarrow"""
+        return self.read(instance)
+
+    def read(self, instance, columns: typing.List[str] = None) -> pd.DataFrame:
+        """Load the DataFrame of the given instance from file
+
+        Parameters
+        ----------
+        instance: Node
+            The instance to load the data for, e.g. 'MyNode.plots.read(MyNode.load())'
+        columns: list[str], optional
+            Only load the given columns. The index is always loaded. For "parquet"
+            and "feather" no other columns are read from disk.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        file = self.get_data_file(instance)
+        if self.format == "csv":
+            value = pd.read_csv(file, index_col=0)
+            return value if columns is None else value[list(columns)]
+
+        pyarrow = _import_pyarrow()
+        if columns is not None:
+            if self.format == "parquet":
+                schema = pyarrow.parquet.read_schema(file)
+            else:
+                with pyarrow.memory_map(str(file)) as source:
+                    schema = pyarrow.ipc.open_file(source).schema
+            # named index columns, a RangeIndex is stored in the metadata only
+            index_columns = [
+                x for x in schema.pandas_metadata["index_columns"] if isinstance(x, str)
+            ]
+            columns = list(columns) + index_columns
+        if self.format == "parquet":
+            table = pyarrow.parquet.read_table(file, columns=columns)
+        else:
+            table = pyarrow.feather.read_table(file, columns=columns, memory_map=True)
+        return table.to_pandas()
@@ -92,7 +92,7 @@ class SplitZnTrackOption(ZnTrackOption):
 
             # Write to params.yaml
             utils.file_io.update_config_file(
-                file=utils.Files.params,
+                file=utils.Files.get_node_file(utils.Files.params, instance.node_name),
                 node_name=instance.node_name,
                 value_name=self.name,
                 value=params_data,
@@ -100,7 +100,7 @@ class SplitZnTrackOption(ZnTrackOption):
 
             # write to zntrack.json
             utils.file_io.update_config_file(
-                file=utils.Files.zntrack,
+                file=utils.Files.get_node_file(utils.Files.zntrack, instance.node_name),
                 node_name=instance.node_name,
                 value_name=self.name,
                 value=zntrack_data,
@@ -120,16 +120,19 @@ class SplitZnTrackOption(ZnTrackOption):
         """
         file = self.get_filename(instance)
         try:
-            # Check that we can read it
-            _ = utils.file_io.read_file(utils.Files.zntrack)[instance.node_name][
+            # select <node><attribute> from the full params / zntrack file
+            zntrack_file = utils.Files.get_node_file(
+                utils.Files.zntrack, instance.node_name
+            )
+            params_file = utils.Files.get_node_file(
+                utils.Files.params, instance.node_name
+            )
+            cls_dict = utils.file_io.read_file_entry(zntrack_file, instance.node_name)[
                 self.name
             ]
-
-            params_values = utils.file_io.read_file(utils.Files.params)
-            cls_dict = utils.file_io.read_file(utils.Files.zntrack)
-            # select <node><attribute> from the full params / zntrack file
-            params_values = params_values[instance.node_name][self.name]
-            cls_dict = cls_dict[instance.node_name][self.name]
+            params_values = utils.file_io.read_file_entry(
+                params_file, instance.node_name
+            )[self.name]
 
             if isinstance(cls_dict, list):
                 value = [combine_values(*x) for x in zip(cls_dict, params_values)]